@@ -0,0 +1,217 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+import click
+
+from mining import (
+    Algorithm,
+    IdSetsLengthStats,
+    TreeNode,
+    calculate_statistics,
+    collect_id_sets_lengths,
+    get_id_sets_map,
+    load_transactions,
+    mine_tree,
+    save_tree,
+)
+
+# pandas is slow to import and only needed for the summary table
+if TYPE_CHECKING:
+    import pandas as pd
+
+ALGORITHMS: list[str] = ["eclat", "declat"]
+
+
+class BatchEntry:
+    def __init__(
+        self, directory: str, supports: list[int], algorithms: list[Algorithm]
+    ) -> None:
+        self.directory: str = directory
+        self.supports: list[int] = supports
+        self.algorithms: list[Algorithm] = algorithms
+
+
+def load_manifest(manifest_path: str) -> list[BatchEntry]:
+    try:
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No manifest file found at {manifest_path}")
+
+    if not isinstance(manifest, list):
+        raise ValueError("Manifest is not a list of entries")
+
+    entries: list[BatchEntry] = []
+    # Entries of the same directory would overwrite each other's trees
+    directories: set[Path] = set()
+    for entry in manifest:
+        if "directory" not in entry:
+            raise ValueError("No directory found in manifest entry")
+
+        if not Path(entry["directory"]).is_dir():
+            raise ValueError(f"Directory {entry['directory']} does not exist")
+
+        directory: Path = Path(entry["directory"]).resolve()
+        if directory in directories:
+            raise ValueError(
+                f"Directory {entry['directory']} is listed in more than one entry"
+            )
+        directories.add(directory)
+
+        supports = entry.get("supports")
+        if (
+            not isinstance(supports, list)
+            or len(supports) == 0
+            or not all(isinstance(s, int) and s >= 1 for s in supports)
+        ):
+            raise ValueError(
+                f"Supports for {entry['directory']} are not a list of positive integers"
+            )
+
+        algorithms = entry.get("algorithms", ["declat"])
+        if (
+            not isinstance(algorithms, list)
+            or len(algorithms) == 0
+            or not all(isinstance(a, str) for a in algorithms)
+        ):
+            raise ValueError(
+                f"Algorithms for {entry['directory']} are not a list of names"
+            )
+
+        for algorithm in algorithms:
+            if algorithm not in ALGORITHMS:
+                raise ValueError(f"Unknown algorithm {algorithm}")
+
+        entries.append(
+            BatchEntry(entry["directory"], sorted(set(supports)), algorithms)
+        )
+
+    return entries
+
+
+def prune_tree(tree: TreeNode, min_support: int) -> TreeNode:
+    # Supports only decrease along a branch and id-sets are relative to
+    # the parent (dEclat) or absolute (Eclat), so the tree for a higher
+    # support is the tree for a lower one without the infrequent branches.
+    pruned: TreeNode = TreeNode(tree.tokens_ids, tree.support, tree.id_set)
+    pruned.tokens = tree.tokens
+    for child in tree.children:
+        if child.support > min_support:
+            pruned.add_child(prune_tree(child, min_support))
+
+    return pruned
+
+
+def get_output_directory(directory: str, min_support: int) -> str:
+    output_directory: str = f"{directory}/support_{min_support}"
+    Path(output_directory).mkdir(parents=True, exist_ok=True)
+
+    return output_directory
+
+
+def run_entry(entry: BatchEntry) -> list[dict[str, Union[str, int, float]]]:
+    rows: list[dict[str, Union[str, int, float]]] = []
+
+    start: float = time.perf_counter()
+    data, tokens_map = load_transactions(entry.directory)
+    load_time: float = time.perf_counter() - start
+
+    for algorithm in entry.algorithms:
+        start = time.perf_counter()
+        id_sets_map: dict[int, set[int]] = get_id_sets_map(
+            data, set(tokens_map.keys()), algorithm
+        )
+        index_time: float = time.perf_counter() - start
+
+        tree: Union[TreeNode, None] = None
+        for min_support in entry.supports:
+            start = time.perf_counter()
+            statistics: IdSetsLengthStats
+            if tree is None:
+                tree, statistics = mine_tree(
+                    data, tokens_map, min_support, algorithm, id_sets_map
+                )
+            else:
+                print(f"Pruning {algorithm} tree to support {min_support}...")
+                tree = prune_tree(tree, min_support)
+                id_sets_lengths: list[int] = []
+                collect_id_sets_lengths(tree, id_sets_lengths)
+                statistics = calculate_statistics(id_sets_lengths)
+            mine_time: float = time.perf_counter() - start
+
+            output_directory: str = get_output_directory(entry.directory, min_support)
+            print(f"Saving {algorithm} tree to {output_directory}...")
+            save_tree(tree, output_directory, min_support, algorithm, statistics)
+
+            rows.append(
+                {
+                    "directory": entry.directory,
+                    "algorithm": algorithm,
+                    "min_support": min_support,
+                    "load_time": load_time,
+                    "index_time": index_time,
+                    "mine_time": mine_time,
+                    **statistics.__dict__,
+                }
+            )
+
+        del id_sets_map
+
+    return rows
+
+
+def run_batch(entries: list[BatchEntry], jobs: int) -> "pd.DataFrame":
+    import pandas as pd
+
+    rows: list[dict[str, Union[str, int, float]]] = []
+
+    if jobs == 1:
+        for entry in entries:
+            rows.extend(run_entry(entry))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for entry_rows in executor.map(run_entry, entries):
+                rows.extend(entry_rows)
+
+    return pd.DataFrame(rows)
+
+
+@click.command()
+@click.option(
+    "-m",
+    "--manifest",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON manifest with directory, supports and algorithms entries",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of datasets processed in parallel",
+)
+@click.option(
+    "-o",
+    "--output",
+    default="summary.csv",
+    show_default=True,
+    type=click.Path(dir_okay=False),
+    help="File to save the summary table to",
+)
+def batch_cli(manifest: str, jobs: int, output: str) -> None:
+    entries: list[BatchEntry] = load_manifest(manifest)
+
+    summary_df: "pd.DataFrame" = run_batch(entries, jobs)
+    summary_df.to_csv(output, index=False)
+
+    print(summary_df.to_string(index=False))
+    print(f"All good! Summary saved to {output}")
+
+
+if __name__ == "__main__":
+    batch_cli()
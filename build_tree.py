@@ -1,72 +1,57 @@
-import json
-from typing import Literal, Union
+from typing import TYPE_CHECKING, Literal, Union
 
 import click
-import pandas as pd
 
-Algorithm = Union[Literal["eclat"], Literal["declat"]]
-
-
-class TreeNode:
-    def __init__(self, tokens_ids: list[int], support: int, id_set: set[int]) -> None:
-        self.tokens_ids: list[int] = tokens_ids
-        self.tokens: list[str] = []
-        self.support: int = support
-        self.id_set: set[int] = id_set
-        self.children: list[TreeNode] = []
-
-    def __repr__(self, layer=0) -> str:
-        repr: str = "  " * layer
-        repr += f"{self.support} - {self.tokens if len(self.tokens) > 0 else self.tokens_ids}\n"
-        for child in self.children:
-            repr += f"{child.__repr__(layer + 1)}"
-
-        return repr
-
-    def __str__(self) -> str:
-        return self.__repr__()
-
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, TreeNode):
-            return False
-
-        return (
-            self.tokens_ids == other.tokens_ids
-            and self.support == other.support
-            and self.id_set == other.id_set
-        )
-
-    def add_child(self, child: "TreeNode") -> None:
-        self.children.append(child)
-
-    def decode(self, tokens_map: dict[int, str]) -> None:
-        self.tokens = [tokens_map[token_id] for token_id in self.tokens_ids]
-        for child in self.children:
-            child.decode(tokens_map)
-
-
-class TreeJSONEncoder(json.JSONEncoder):
-    def default(self, o: object) -> object:
-        if isinstance(o, TreeNode):
-            return o.__dict__
-        if isinstance(o, set):
-            return list(o)
-
-        return json.JSONEncoder.default(self, o)
-
-
-class IdSetsLengthStats:
-    def __init__(
-        self, num_nodes: int, min: int, max: int, avg: float, median: int
-    ) -> None:
-        self.num_nodes: int = num_nodes
-        self.min: int = min
-        self.max: int = max
-        self.avg: float = avg
-        self.median: int = median
+from mining import (
+    Algorithm,
+    Constraints,
+    IdSetsLengthStats,
+    TreeJSONEncoder,
+    TreeNode,
+    build_declat_root,
+    build_declat_tree,
+    build_eclat_root,
+    build_eclat_tree,
+    calculate_statistics,
+    create_constraints,
+    get_dif_sets_map,
+    get_tid_sets_map,
+    load_transactions,
+    mine_tree,
+    resolve_algorithm,
+    save_tree,
+)
 
+# The mining core moved to mining.py, its former functions stay importable
+# from here for existing callers
+__all__ = [
+    "TreeJSONEncoder",
+    "TreeNode",
+    "IdSetsLengthStats",
+    "build_declat_root",
+    "build_declat_tree",
+    "build_eclat_root",
+    "build_eclat_tree",
+    "calculate_statistics",
+    "get_dif_sets_map",
+    "get_tid_sets_map",
+    "load_data",
+    "save_tree",
+    "validate_data",
+    "validate_tokens_map",
+    "build_tree",
+    "build_tree_with_algorithm",
+    "build_tree_cli",
+]
+
+# pandas is slow to import and only needed by the DataFrame loaders below
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def load_data(directory: str) -> tuple["pd.DataFrame", "pd.DataFrame"]:
+    import pandas as pd
 
-def load_data(directory: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     try:
         tokens_map_df: pd.DataFrame = pd.read_json(
             f"{directory}/tokens_map.json"
@@ -82,7 +67,7 @@ def load_data(directory: str) -> tuple[pd.DataFrame, pd.DataFrame]:
         raise FileNotFoundError("No data.json file found in the directory")
 
 
-def validate_data(data_df: pd.DataFrame, all_tokens_ids: set[int]) -> None:
+def validate_data(data_df: "pd.DataFrame", all_tokens_ids: set[int]) -> None:
     if "tokens" not in data_df.columns:
         raise ValueError("No tokens column found in data.json")
 
@@ -95,7 +80,7 @@ def validate_data(data_df: pd.DataFrame, all_tokens_ids: set[int]) -> None:
                 raise ValueError(f"Token {token} not found in tokens_map.json")
 
 
-def validate_tokens_map(tokens_map_df: pd.DataFrame) -> None:
+def validate_tokens_map(tokens_map_df: "pd.DataFrame") -> None:
     if "token" not in tokens_map_df.columns:
         raise ValueError("No token column found in tokens_map.json")
 
@@ -109,198 +94,60 @@ def validate_tokens_map(tokens_map_df: pd.DataFrame) -> None:
         raise ValueError("Duplicate tokens ids found in tokens_map.json")
 
 
-# DECLAT
-def get_dif_sets_map(
-    data: dict[int, list[int]], all_tokens_ids: set[int]
-) -> dict[int, set[int]]:
-    dif_map: dict[int, set[int]] = {token_id: set() for token_id in all_tokens_ids}
-    for transaction_id, tokens_ids in data.items():
-        non_existing_tokens_ids: set[int] = all_tokens_ids - set(tokens_ids)
-        for token_id in non_existing_tokens_ids:
-            dif_map[token_id].add(transaction_id)
-
-    return dif_map
-
-
-def build_declat_root(
-    id_sets_map: dict[int, set[int]],
-    num_transactions: int,
-    min_support: int,
-    id_sets_lengths: list[int] = [],
-) -> TreeNode:
-    declat_tree: TreeNode = TreeNode([], num_transactions, set())
-
-    for token_id, dif_list in id_sets_map.items():
-        node_support: int = num_transactions - len(dif_list)
-        if node_support > min_support:
-            id_sets_lengths.append(len(dif_list))
-            declat_tree.add_child(TreeNode([token_id], node_support, dif_list))
-
-    return declat_tree
-
-
-def build_declat_tree(
-    layer: list[TreeNode], min_support, id_sets_lengths: list[int] = []
-) -> None:
-    if len(layer) == 0:
-        return
-
-    new_layer: list[TreeNode] = []
-
-    for i, node in enumerate(layer):
-        for other_node in layer[i + 1 :]:
-            if node.tokens_ids[:-1] == other_node.tokens_ids[:-1]:
-                new_id_set: set[int] = other_node.id_set - node.id_set
-                new_support: int = node.support - len(new_id_set)
-                if new_support > min_support:
-                    id_sets_lengths.append(len(new_id_set))
-                    new_node: TreeNode = TreeNode(
-                        node.tokens_ids + [other_node.tokens_ids[-1]],
-                        new_support,
-                        new_id_set,
-                    )
-                    node.add_child(new_node)
-                    new_layer.append(new_node)
-
-    build_declat_tree(new_layer, min_support)
-
-
-# ECLAT
-def get_tid_sets_map(
-    data: dict[int, list[int]], all_tokens_ids: set[int]
-) -> dict[int, set[int]]:
-    tid_map: dict[int, set[int]] = {token_id: set() for token_id in all_tokens_ids}
-    for transaction_id, tokens_ids in data.items():
-        for token_id in tokens_ids:
-            tid_map[token_id].add(transaction_id)
-
-    return tid_map
-
-
-def build_eclat_root(
-    id_sets_map: dict[int, set[int]],
-    min_support: int,
-    all_transaction_ids: set[int],
-    id_sets_lengths: list[int] = [],
-) -> TreeNode:
-    eclat_tree: TreeNode = TreeNode([], len(all_transaction_ids), all_transaction_ids)
-
-    for token_id, tid_list in id_sets_map.items():
-        node_support: int = len(tid_list)
-        if node_support > min_support:
-            id_sets_lengths.append(len(tid_list))
-            eclat_tree.add_child(TreeNode([token_id], node_support, tid_list))
-
-    return eclat_tree
-
-
-def build_eclat_tree(
-    layer: list[TreeNode], min_support, id_sets_lengths: list[int] = []
-) -> None:
-    if len(layer) == 0:
-        return
-
-    new_layer: list[TreeNode] = []
-
-    for i, node in enumerate(layer):
-        for other_node in layer[i + 1 :]:
-            if node.tokens_ids[:-1] == other_node.tokens_ids[:-1]:
-                new_id_set: set[int] = node.id_set & other_node.id_set
-                new_support: int = len(new_id_set)
-                if new_support > min_support:
-                    id_sets_lengths.append(len(new_id_set))
-                    new_node: TreeNode = TreeNode(
-                        node.tokens_ids + [other_node.tokens_ids[-1]],
-                        new_support,
-                        new_id_set,
-                    )
-                    node.add_child(new_node)
-                    new_layer.append(new_node)
-
-    build_eclat_tree(new_layer, min_support)
-
-
-def save_tree(
-    declat_tree: TreeNode,
+def build_tree_with_algorithm(
     directory: str,
     min_support: int,
-    algorithm: Algorithm,
-    id_sets_length_stats: IdSetsLengthStats,
-) -> None:
-    result = {
-        "min_support": min_support,
-        "id_sets_length_stats": id_sets_length_stats.__dict__,
-        "tree": declat_tree,
-    }
-    with open(f"{directory}/{algorithm}.json", "w") as file:
-        json.dump(result, file, indent=2, cls=TreeJSONEncoder)
-
-
-def calculate_statistics(id_sets_lengths: list[int]) -> IdSetsLengthStats:
-    id_sets_lengths.sort()
-    num_id_sets: int = len(id_sets_lengths)
-    return IdSetsLengthStats(
-        num_nodes=num_id_sets,
-        min=id_sets_lengths[0] if num_id_sets > 0 else 0,
-        max=id_sets_lengths[-1] if num_id_sets > 0 else 0,
-        avg=sum(id_sets_lengths) / num_id_sets if num_id_sets > 0 else 0,
-        median=id_sets_lengths[num_id_sets // 2] if num_id_sets > 0 else 0,
+    algorithm: Union[Algorithm, Literal["auto"]],
+    max_length: Union[int, None] = None,
+    required_tokens: list[str] = [],
+    excluded_tokens: list[str] = [],
+    allowed_tokens: Union[list[str], None] = None,
+    deduplicate: bool = False,
+    prune_pairs: bool = False,
+) -> tuple[TreeNode, IdSetsLengthStats, Algorithm]:
+    # Also returns the algorithm that was run, which auto resolves
+    data, tokens_map = load_transactions(directory)
+    constraints: Union[Constraints, None] = create_constraints(
+        tokens_map, max_length, required_tokens, excluded_tokens, allowed_tokens
+    )
+    resolved_algorithm: Algorithm = resolve_algorithm(data, min_support, algorithm)
+
+    tree, statistics = mine_tree(
+        data,
+        tokens_map,
+        min_support,
+        resolved_algorithm,
+        None,
+        constraints,
+        deduplicate,
+        prune_pairs,
     )
 
+    return tree, statistics, resolved_algorithm
+
 
 def build_tree(
-    directory: str, min_support: int, algorithm: Algorithm
+    directory: str,
+    min_support: int,
+    algorithm: Union[Algorithm, Literal["auto"]],
+    max_length: Union[int, None] = None,
+    required_tokens: list[str] = [],
+    excluded_tokens: list[str] = [],
+    allowed_tokens: Union[list[str], None] = None,
+    deduplicate: bool = False,
+    prune_pairs: bool = False,
 ) -> tuple[TreeNode, IdSetsLengthStats]:
-    print("Reading data...")
-    data_df, tokens_map_df = load_data(directory)
-
-    print("Validating tokens_map.json...")
-    validate_tokens_map(tokens_map_df)
-    tokens_map: dict[int, str] = {
-        token_id: row["token"] for token_id, row in tokens_map_df.iterrows()
-    }
-    all_tokens_ids: set[int] = set(tokens_map.keys())
-
-    print("Validating data.json...")
-    validate_data(data_df, all_tokens_ids)
-    data: dict[int, list[int]] = {
-        transaction_id: row["tokens"] for transaction_id, row in data_df.iterrows()
-    }
-
-    num_transactions: int = len(data)
-    tree: Union[TreeNode, None] = None
-    id_sets_lengths: list[int] = []
-
-    if algorithm == "declat":
-        print("Creating dif-sets...")
-        dif_sets_map: dict[int, set[int]] = get_dif_sets_map(data, all_tokens_ids)
-
-        print(f"Building {algorithm} root...")
-        tree = build_declat_root(
-            dif_sets_map, num_transactions, min_support, id_sets_lengths
-        )
-
-        print(f"Building {algorithm} tree...")
-        build_declat_tree(tree.children, min_support, id_sets_lengths)
-    elif algorithm == "eclat":
-        print("Creating tid-sets...")
-        tid_sets_map: dict[int, set[int]] = get_tid_sets_map(data, all_tokens_ids)
-
-        print(f"Building {algorithm} root...")
-        tree = build_eclat_root(
-            tid_sets_map, min_support, set(data.keys()), id_sets_lengths
-        )
-
-        print(f"Building {algorithm} tree...")
-        build_eclat_tree(tree.children, min_support, id_sets_lengths)
-    else:
-        raise ValueError(f"Unknown algorithm {algorithm}")
-
-    print("Decoding tokens...")
-    tree.decode(tokens_map)
-
-    print("Calculating statistics...")
-    statistics: IdSetsLengthStats = calculate_statistics(id_sets_lengths)
+    tree, statistics, _ = build_tree_with_algorithm(
+        directory,
+        min_support,
+        algorithm,
+        max_length,
+        required_tokens,
+        excluded_tokens,
+        allowed_tokens,
+        deduplicate,
+        prune_pairs,
+    )
 
     return tree, statistics
 
@@ -325,16 +172,124 @@ def build_tree(
     "--algorithm",
     default="declat",
     show_default=True,
-    type=click.Choice(["declat", "eclat"]),
-    help="Algorithm to run",
+    type=click.Choice(["declat", "eclat", "fpgrowth", "auto"]),
+    help="Algorithm to run, auto picks one from the dataset profile",
+)
+@click.option(
+    "-l",
+    "--max_length",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Maximum length of frequent itemsets",
+)
+@click.option(
+    "-r",
+    "--require",
+    "required_tokens",
+    multiple=True,
+    help="Token that every itemset must contain. Can be repeated",
+)
+@click.option(
+    "-e",
+    "--exclude",
+    "excluded_tokens",
+    multiple=True,
+    help="Token that no itemset may contain. Can be repeated",
+)
+@click.option(
+    "--allow",
+    "allowed_tokens",
+    multiple=True,
+    help="Restrict itemsets to the given tokens. Can be repeated",
+)
+@click.option(
+    "--deduplicate",
+    is_flag=True,
+    default=False,
+    help="Merge identical transactions and mine them with weighted supports",
 )
-def build_tree_cli(directory: str, support: int, algorithm: Algorithm) -> None:
-    tree, statistics = build_tree(directory, support, algorithm)
+@click.option(
+    "--prune_pairs",
+    is_flag=True,
+    default=False,
+    help="Skip joins of tokens whose pair is infrequent, using precomputed "
+    "2-itemset supports",
+)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    default="json",
+    show_default=True,
+    type=click.Choice(["json", "binary", "chunked"]),
+    help="Output format of the tree",
+)
+@click.option(
+    "-c",
+    "--compression",
+    default="zlib",
+    show_default=True,
+    type=click.Choice(["none", "zlib", "zstd", "lz4"]),
+    help="Block compression. Used only for binary format",
+)
+@click.option(
+    "--max_chunk_nodes",
+    default=1000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Maximum number of nodes kept inline in a chunk. Used only for chunked format",
+)
+def build_tree_cli(
+    directory: str,
+    support: int,
+    algorithm: Union[Algorithm, Literal["auto"]],
+    max_length: Union[int, None],
+    required_tokens: tuple[str, ...],
+    excluded_tokens: tuple[str, ...],
+    allowed_tokens: tuple[str, ...],
+    deduplicate: bool,
+    prune_pairs: bool,
+    output_format: str,
+    compression: str,
+    max_chunk_nodes: int,
+) -> None:
+    if output_format == "binary":
+        from tree_format import get_codec
+
+        # Checked before mining, so a missing package does not waste a run
+        try:
+            get_codec(compression)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="'-c' / '--compression'")
+
+    tree, statistics, algorithm = build_tree_with_algorithm(
+        directory,
+        support,
+        algorithm,
+        max_length,
+        list(required_tokens),
+        list(excluded_tokens),
+        list(allowed_tokens) if len(allowed_tokens) > 0 else None,
+        deduplicate,
+        prune_pairs,
+    )
 
     print(f"Saving {algorithm} tree...")
-    save_tree(tree, directory, support, algorithm, statistics)
+    if output_format == "binary":
+        from tree_format import save_tree_binary
+
+        save_tree_binary(tree, directory, support, algorithm, statistics, compression)
+        print(f"All good! {algorithm} tree saved to {directory}/{algorithm}.bin")
+    elif output_format == "chunked":
+        from tree_format import save_tree_chunked
 
-    print(f"All good! Declat tree saved to {directory}/{algorithm}.json")
+        save_tree_chunked(
+            tree, directory, support, algorithm, statistics, max_chunk_nodes
+        )
+        print(f"All good! {algorithm} tree saved to {directory}/{algorithm}.index.json")
+    else:
+        save_tree(tree, directory, support, algorithm, statistics)
+        print(f"All good! {algorithm} tree saved to {directory}/{algorithm}.json")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+from typing import Union
+
+Itemset = tuple[int, ...]
+
+
+class FPNode:
+    def __init__(self, token_id: int, parent: Union["FPNode", None]) -> None:
+        self.token_id: int = token_id
+        self.count: int = 0
+        self.parent: Union[FPNode, None] = parent
+        self.children: dict[int, FPNode] = {}
+
+
+class FPTree:
+    def __init__(self) -> None:
+        self.root: FPNode = FPNode(-1, None)
+        # Nodes of every token, used to collect its prefix paths
+        self.header: dict[int, list[FPNode]] = {}
+
+    def add(self, tokens_ids: list[int], count: int) -> None:
+        node: FPNode = self.root
+        for token_id in tokens_ids:
+            child: Union[FPNode, None] = node.children.get(token_id)
+            if child is None:
+                child = FPNode(token_id, node)
+                node.children[token_id] = child
+                self.header.setdefault(token_id, []).append(child)
+            child.count += count
+            node = child
+
+    def get_prefix_paths(self, token_id: int) -> list[tuple[list[int], int]]:
+        paths: list[tuple[list[int], int]] = []
+        for node in self.header[token_id]:
+            path: list[int] = []
+            parent: Union[FPNode, None] = node.parent
+            while parent is not None and parent.parent is not None:
+                path.append(parent.token_id)
+                parent = parent.parent
+            if len(path) > 0:
+                paths.append((path, node.count))
+
+        return paths
+
+
+def build_fp_tree(
+    transactions: list[tuple[list[int], int]], min_support: int
+) -> tuple[FPTree, dict[int, int]]:
+    supports: dict[int, int] = {}
+    for tokens_ids, count in transactions:
+        for token_id in tokens_ids:
+            supports[token_id] = supports.get(token_id, 0) + count
+
+    frequent_supports: dict[int, int] = {
+        token_id: support
+        for token_id, support in supports.items()
+        if support > min_support
+    }
+
+    # Most frequent tokens first, so transactions share the longest prefixes
+    fp_tree: FPTree = FPTree()
+    for tokens_ids, count in transactions:
+        fp_tree.add(
+            sorted(
+                (token_id for token_id in tokens_ids if token_id in frequent_supports),
+                key=lambda token_id: (-frequent_supports[token_id], token_id),
+            ),
+            count,
+        )
+
+    return fp_tree, frequent_supports
+
+
+def mine_fp_tree(
+    fp_tree: FPTree,
+    supports: dict[int, int],
+    suffix: Itemset,
+    min_support: int,
+    max_length: Union[int, None],
+    itemsets: dict[Itemset, int],
+) -> None:
+    for token_id, support in supports.items():
+        itemset: Itemset = suffix + (token_id,)
+        itemsets[itemset] = support
+        if max_length is not None and len(itemset) >= max_length:
+            continue
+
+        conditional_tree, conditional_supports = build_fp_tree(
+            fp_tree.get_prefix_paths(token_id), min_support
+        )
+        mine_fp_tree(
+            conditional_tree,
+            conditional_supports,
+            itemset,
+            min_support,
+            max_length,
+            itemsets,
+        )
+
+
+def fpgrowth(
+    data: dict[int, list[int]],
+    min_support: int,
+    max_length: Union[int, None] = None,
+    weights: Union[dict[int, int], None] = None,
+) -> dict[Itemset, int]:
+    transactions: list[tuple[list[int], int]] = [
+        (list(set(tokens_ids)), 1 if weights is None else weights[transaction_id])
+        for transaction_id, tokens_ids in data.items()
+    ]
+    fp_tree, supports = build_fp_tree(transactions, min_support)
+
+    itemsets: dict[Itemset, int] = {}
+    mine_fp_tree(fp_tree, supports, (), min_support, max_length, itemsets)
+
+    return itemsets
@@ -2,14 +2,16 @@ import json
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Literal, Union
+from typing import TYPE_CHECKING, Literal, Union
 
 import click
-import nltk
-import pandas as pd
-import praw
 
-from reddit_secrets import CLIENT_ID, CLIENT_SECRET
+# nltk, pandas and praw are slow to import, so they are imported by the
+# functions that use them
+if TYPE_CHECKING:
+    import nltk
+    import pandas as pd
+    import praw
 
 Listing = Union[
     Literal["hot"], Literal["new"], Literal["top"], Literal["controversial"]
@@ -24,41 +26,116 @@ Time_filter = Union[
 ]
 
 
-def stem(stemmer: nltk.stem.PorterStemmer, title: str) -> list[str]:
+def stem(stemmer: "nltk.stem.PorterStemmer", title: str) -> list[str]:
+    import nltk
+
     word_tokens = nltk.tokenize.word_tokenize(title)
     return [stemmer.stem(w) for w in word_tokens]
 
 
+def remove_non_alpha_title(title: str) -> str:
+    return re.sub(r"[^a-zA-Z\s]", "", title)
+
+
 def remove_non_alpha(series: "pd.Series[str]") -> "pd.Series[str]":
-    return series.apply(lambda x: re.sub(r"[^a-zA-Z\s]", "", x))
+    return series.apply(remove_non_alpha_title)
 
 
 def remove_duplicates_in_rows(series: "pd.Series[list[str]]") -> "pd.Series[list[str]]":
     return series.apply(lambda x: list(dict.fromkeys(x)))
 
 
+def preprocess_title(stemmer: "nltk.stem.PorterStemmer", title: str) -> list[str]:
+    # Same steps as the series pipeline, applied to a single title
+    return list(dict.fromkeys(stem(stemmer, remove_non_alpha_title(title))))
+
+
+def add_token_ids(tokens: list[str], tokens_map: dict[str, int]) -> list[int]:
+    row_token_ids: list[int] = []
+    for token in tokens:
+        token_id: int | None = tokens_map.get(token)
+        if token_id is None:
+            token_id = len(tokens_map)
+            row_token_ids.append(token_id)
+            tokens_map[token] = token_id
+        else:
+            row_token_ids.append(token_id)
+
+    return row_token_ids
+
+
 def create_token_ids(
     series: "pd.Series[list[str]]",
 ) -> tuple["pd.Series[list[int]]", dict[str, int]]:
+    import pandas as pd
+
     tokens_map: dict[str, int] = {}
     token_ids: dict[int, list[int]] = {}
 
     for i, tokens in series.items():
-        row_token_ids: list[int] = []
-        for token in tokens:
-            token_id: int | None = tokens_map.get(token)
-            if token_id is None:
-                token_id = len(tokens_map)
-                row_token_ids.append(token_id)
-                tokens_map[token] = token_id
-            else:
-                row_token_ids.append(token_id)
-
-        token_ids[i] = row_token_ids
+        token_ids[i] = add_token_ids(tokens, tokens_map)
 
     return pd.Series(token_ids, dtype=object), tokens_map
 
 
+def ensure_punkt() -> None:
+    import nltk
+
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        nltk.download("punkt")
+
+
+def create_reddit_client() -> "praw.Reddit":
+    import praw
+
+    # Imported here, so the rest of the module works without credentials
+    from reddit_secrets import CLIENT_ID, CLIENT_SECRET
+
+    return praw.Reddit(
+        client_id=CLIENT_ID, client_secret=CLIENT_SECRET, user_agent="EitiMed"
+    )
+
+
+def get_output_directory(
+    directory: str,
+    subreddit: str,
+    num_posts: int,
+    listing: Listing,
+    time_filter: Time_filter,
+) -> str:
+    output_dir = f"{directory}/{subreddit}_{num_posts}_{listing}"
+    if listing in ["top", "controversial"]:
+        output_dir += f"_{time_filter}"
+
+    time = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir += f"_{time}"
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    return output_dir
+
+
+def save_dataset(
+    output_dir: str,
+    data_df: "pd.DataFrame",
+    tokens_map: dict[str, int],
+    metadata: dict[str, Union[str, int]],
+) -> None:
+    import pandas as pd
+
+    tokens_map_df = pd.DataFrame(
+        list(tokens_map.items()), columns=["token", "token_id"]
+    ).set_index("token_id")
+
+    data_df.to_json(f"{output_dir}/data.json", indent=2)
+    tokens_map_df.to_json(f"{output_dir}/tokens_map.json", indent=2)
+
+    with open(f"{output_dir}/metadata.json", "w") as file:
+        json.dump(metadata, file, indent=2)
+
+
 @click.command()
 @click.option("-s", "--subreddit", required=True, help="Subreddit to scrape")
 @click.option(
@@ -100,9 +177,10 @@ def get_reddit_data(
     time_filter: Time_filter,
     directory: str,
 ) -> None:
-    reddit = praw.Reddit(
-        client_id=CLIENT_ID, client_secret=CLIENT_SECRET, user_agent="EitiMed"
-    )
+    import nltk
+    import pandas as pd
+
+    reddit = create_reddit_client()
     subreddit = subreddit.lower()
     sub = reddit.subreddit(subreddit)
 
@@ -129,12 +207,9 @@ def get_reddit_data(
     )
 
     print("Removing non-alphabetic characters...")
-    titles: pd.Series[str] = remove_non_alpha(data_df["title"])
+    titles: "pd.Series[str]" = remove_non_alpha(data_df["title"])
 
-    try:
-        nltk.data.find("tokenizers/punkt")
-    except LookupError:
-        nltk.download("punkt")
+    ensure_punkt()
 
     print("Stemming titles...")
     ps = nltk.stem.PorterStemmer()
@@ -145,34 +220,22 @@ def get_reddit_data(
 
     print("Creating token ids...")
     data_df["tokens"], tokens_map = create_token_ids(stemmed_titles)
-    tokens_map_df = pd.DataFrame(
-        list(tokens_map.items()), columns=["token", "token_id"]
-    ).set_index("token_id")
 
     print("Saving data...")
-    output_dir = f"{directory}/{subreddit}_{num_posts}_{listing}"
-    if listing in ["top", "controversial"]:
-        output_dir += f"_{time_filter}"
-
-    time = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir += f"_{time}"
-
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-
-    data_df.to_json(f"{output_dir}/data.json", indent=2)
-    tokens_map_df.to_json(f"{output_dir}/tokens_map.json", indent=2)
-
-    with open(f"{output_dir}/metadata.json", "w") as file:
-        json.dump(
-            {
-                "subreddit": subreddit,
-                "listing": listing,
-                "time_filter": time_filter,
-                "num_posts": num_posts,
-            },
-            file,
-            indent=2,
-        )
+    output_dir = get_output_directory(
+        directory, subreddit, num_posts, listing, time_filter
+    )
+    save_dataset(
+        output_dir,
+        data_df,
+        tokens_map,
+        {
+            "subreddit": subreddit,
+            "listing": listing,
+            "time_filter": time_filter,
+            "num_posts": num_posts,
+        },
+    )
 
     print(f"All good! Data saved to {output_dir}")
 
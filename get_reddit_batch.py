@@ -0,0 +1,482 @@
+import json
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterator, Union
+
+import click
+
+from get_reddit import (
+    Listing,
+    Time_filter,
+    add_token_ids,
+    create_reddit_client,
+    ensure_punkt,
+    get_output_directory,
+    preprocess_title,
+    save_dataset,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import praw
+
+# Maximum number of posts Reddit returns in a single listing request
+PAGE_SIZE = 100
+
+
+class Post:
+    def __init__(self, id: str, title: str) -> None:
+        self.id: str = id
+        self.title: str = title
+
+
+class ScrapeJob:
+    def __init__(
+        self,
+        subreddit: str,
+        listing: Listing,
+        time_filter: Time_filter,
+        num_posts: int,
+    ) -> None:
+        self.subreddit: str = subreddit.lower()
+        self.listing: Listing = listing
+        self.time_filter: Time_filter = time_filter
+        self.num_posts: int = num_posts
+        self.error: Union[Exception, None] = None
+
+    def __str__(self) -> str:
+        return f"r/{self.subreddit} {self.listing}"
+
+
+class FetchError(Exception):
+    # Transient failure, the request can be retried
+    def __init__(self, message: str, retry_after: Union[float, None] = None) -> None:
+        super().__init__(message)
+        self.retry_after: Union[float, None] = retry_after
+
+
+class Backend(ABC):
+    @abstractmethod
+    def fetch_page(
+        self, job: ScrapeJob, after: Union[str, None], limit: int
+    ) -> tuple[list[Post], Union[str, None]]:
+        # Returns the posts and the cursor of the next page, None on the last one
+        ...
+
+
+class PrawBackend(Backend):
+    # praw.Reddit is not thread safe and keeps its session and rate limit
+    # state per instance, so every worker thread gets a client of its own
+    def __init__(self) -> None:
+        self.clients: threading.local = threading.local()
+        # Created right away, so missing credentials fail before scraping
+        self.get_client()
+
+    def get_client(self) -> "praw.Reddit":
+        reddit: Union["praw.Reddit", None] = getattr(self.clients, "reddit", None)
+        if reddit is None:
+            reddit = create_reddit_client()
+            self.clients.reddit = reddit
+
+        return reddit
+
+    def fetch_page(
+        self, job: ScrapeJob, after: Union[str, None], limit: int
+    ) -> tuple[list[Post], Union[str, None]]:
+        import prawcore
+
+        sub = self.get_client().subreddit(job.subreddit)
+        params: dict[str, str] = {"after": after} if after is not None else {}
+        if job.listing in ["top", "controversial"]:
+            submissions = getattr(sub, job.listing)(
+                limit=limit, time_filter=job.time_filter, params=params
+            )
+        else:
+            submissions = getattr(sub, job.listing)(limit=limit, params=params)
+
+        try:
+            posts: list[Post] = [
+                Post(submission.fullname, submission.title)
+                for submission in submissions
+            ]
+        except prawcore.exceptions.TooManyRequests as e:
+            retry_after: Union[str, None] = e.response.headers.get("retry-after")
+            raise FetchError(
+                str(e), float(retry_after) if retry_after is not None else None
+            )
+        except (
+            prawcore.exceptions.ServerError,
+            prawcore.exceptions.RequestException,
+        ) as e:
+            raise FetchError(str(e))
+
+        return posts, posts[-1].id if len(posts) == limit else None
+
+
+class FakeBackend(Backend):
+    # Serves titles from memory in place of Reddit, the same ones for every
+    # listing. The first `failures` requests fail with a transient error.
+    def __init__(
+        self,
+        titles: dict[str, list[str]],
+        latency: float = 0.0,
+        failures: int = 0,
+    ) -> None:
+        self.titles: dict[str, list[str]] = {
+            subreddit.lower(): subreddit_titles
+            for subreddit, subreddit_titles in titles.items()
+        }
+        self.latency: float = latency
+        self.failures: int = failures
+        self.num_requests: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def from_file(path: str) -> "FakeBackend":
+        try:
+            with open(path) as file:
+                titles = json.load(file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No fake posts file found at {path}")
+
+        if not isinstance(titles, dict) or not all(
+            isinstance(subreddit_titles, list) for subreddit_titles in titles.values()
+        ):
+            raise ValueError("Fake posts file is not a map of subreddits to titles")
+
+        return FakeBackend(titles)
+
+    def fetch_page(
+        self, job: ScrapeJob, after: Union[str, None], limit: int
+    ) -> tuple[list[Post], Union[str, None]]:
+        with self.lock:
+            self.num_requests += 1
+            failed: bool = self.num_requests <= self.failures
+        time.sleep(self.latency)
+        if failed:
+            raise FetchError("Fake transient failure")
+
+        if job.subreddit not in self.titles:
+            raise ValueError(f"Subreddit {job.subreddit} not found")
+
+        titles: list[str] = self.titles[job.subreddit]
+        start: int = int(after) if after is not None else 0
+        posts: list[Post] = [
+            Post(f"{job.subreddit}_{index}", titles[index])
+            for index in range(start, min(start + limit, len(titles)))
+        ]
+        end: int = start + len(posts)
+
+        return posts, str(end) if end < len(titles) else None
+
+
+class RateLimiter:
+    # Spaces requests of all threads evenly within the per minute budget
+    def __init__(
+        self,
+        requests_per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval: float = 60 / requests_per_minute
+        self.clock: Callable[[], float] = clock
+        self.sleep: Callable[[float], None] = sleep
+        self.next_time: Union[float, None] = None
+        self.lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now: float = self.clock()
+            request_time: float = (
+                now if self.next_time is None else max(now, self.next_time)
+            )
+            self.next_time = request_time + self.interval
+
+        if request_time > now:
+            self.sleep(request_time - now)
+
+
+def fetch_page_with_retries(
+    backend: Backend,
+    rate_limiter: RateLimiter,
+    job: ScrapeJob,
+    after: Union[str, None],
+    limit: int,
+    retries: int,
+    backoff: float,
+    sleep: Callable[[float], None] = time.sleep,
+) -> tuple[list[Post], Union[str, None]]:
+    attempt: int = 0
+    while True:
+        rate_limiter.acquire()
+        try:
+            return backend.fetch_page(job, after, limit)
+        except FetchError as e:
+            if attempt == retries:
+                raise
+
+            delay: float = backoff * 2**attempt
+            if e.retry_after is not None:
+                delay = max(delay, e.retry_after)
+            print(f"WARNING: Request for {job} failed ({e}), retrying in {delay}s")
+            sleep(delay)
+            attempt += 1
+
+
+def scrape_job(
+    job: ScrapeJob,
+    backend: Backend,
+    rate_limiter: RateLimiter,
+    retries: int,
+    backoff: float,
+    posts_queue: "queue.Queue[tuple[ScrapeJob, Union[Post, None]]]",
+) -> None:
+    # Listings can shift between requests, so repeated posts are skipped
+    seen_ids: set[str] = set()
+    after: Union[str, None] = None
+    try:
+        while len(seen_ids) < job.num_posts:
+            posts, after = fetch_page_with_retries(
+                backend,
+                rate_limiter,
+                job,
+                after,
+                min(PAGE_SIZE, job.num_posts - len(seen_ids)),
+                retries,
+                backoff,
+            )
+            for post in posts:
+                if post.id not in seen_ids and len(seen_ids) < job.num_posts:
+                    seen_ids.add(post.id)
+                    posts_queue.put((job, post))
+
+            if after is None or len(posts) == 0:
+                break
+    except Exception as e:
+        print(f"WARNING: Scraping {job} failed: {e}")
+        job.error = e
+    finally:
+        posts_queue.put((job, None))
+
+
+def stream_posts(
+    jobs: list[ScrapeJob],
+    backend: Backend,
+    rate_limiter: RateLimiter,
+    workers: int,
+    retries: int = 3,
+    backoff: float = 1.0,
+) -> Iterator[tuple[ScrapeJob, Post]]:
+    # Posts are yielded as soon as any job receives them
+    posts_queue: "queue.Queue[tuple[ScrapeJob, Union[Post, None]]]" = queue.Queue()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for job in jobs:
+            executor.submit(
+                scrape_job, job, backend, rate_limiter, retries, backoff, posts_queue
+            )
+
+        num_running: int = len(jobs)
+        while num_running > 0:
+            job, post = posts_queue.get()
+            if post is None:
+                num_running -= 1
+            else:
+                yield job, post
+
+
+class DatasetBuilder:
+    def __init__(self, tokenize: Callable[[str], list[str]]) -> None:
+        self.tokenize: Callable[[str], list[str]] = tokenize
+        self.titles: list[str] = []
+        self.tokens: list[list[int]] = []
+        self.tokens_map: dict[str, int] = {}
+
+    def add(self, title: str) -> None:
+        self.titles.append(title)
+        self.tokens.append(add_token_ids(self.tokenize(title), self.tokens_map))
+
+    def to_data_df(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame({"title": self.titles, "tokens": self.tokens})
+
+
+def create_title_tokenizer() -> Callable[[str], list[str]]:
+    import nltk
+
+    ensure_punkt()
+    stemmer = nltk.stem.PorterStemmer()
+
+    return lambda title: preprocess_title(stemmer, title)
+
+
+def scrape_batch(
+    jobs: list[ScrapeJob],
+    backend: Backend,
+    rate_limiter: RateLimiter,
+    workers: int,
+    retries: int,
+    backoff: float,
+    directory: str,
+    tokenize: Callable[[str], list[str]],
+) -> list[str]:
+    builders: dict[ScrapeJob, DatasetBuilder] = {
+        job: DatasetBuilder(tokenize) for job in jobs
+    }
+
+    print(f"Scraping {len(jobs)} listings...")
+    for job, post in stream_posts(
+        jobs, backend, rate_limiter, workers, retries, backoff
+    ):
+        builders[job].add(post.title)
+
+    output_dirs: list[str] = []
+    for job in jobs:
+        if job.error is not None:
+            print(f"WARNING: Skipping {job}")
+            continue
+
+        builder: DatasetBuilder = builders[job]
+        num_posts: int = len(builder.titles)
+        if num_posts < job.num_posts:
+            print(f"WARNING: Only {num_posts} posts found for {job}")
+
+        print(f"Saving {job}...")
+        output_dir: str = get_output_directory(
+            directory, job.subreddit, num_posts, job.listing, job.time_filter
+        )
+        save_dataset(
+            output_dir,
+            builder.to_data_df(),
+            builder.tokens_map,
+            {
+                "subreddit": job.subreddit,
+                "listing": job.listing,
+                "time_filter": job.time_filter,
+                "num_posts": num_posts,
+            },
+        )
+        output_dirs.append(output_dir)
+
+    return output_dirs
+
+
+@click.command()
+@click.option(
+    "-s",
+    "--subreddit",
+    "subreddits",
+    required=True,
+    multiple=True,
+    help="Subreddit to scrape. Can be repeated",
+)
+@click.option(
+    "-n",
+    "--num_posts",
+    default=100,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of posts to scrape from every listing",
+)
+@click.option(
+    "-l",
+    "--listing",
+    "listings",
+    default=["top"],
+    show_default=True,
+    multiple=True,
+    type=click.Choice(["hot", "new", "top", "controversial"]),
+    help="Listing to use. Can be repeated",
+)
+@click.option(
+    "-t",
+    "--time_filter",
+    default="all",
+    show_default=True,
+    type=click.Choice(["day", "week", "month", "year", "all"]),
+    help="Time filter. Used only for top and controversial",
+)
+@click.option(
+    "-d",
+    "--directory",
+    default="data",
+    show_default=True,
+    type=click.Path(),
+    help="Directory to save the data",
+)
+@click.option(
+    "-j",
+    "--workers",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of listings fetched concurrently",
+)
+@click.option(
+    "-r",
+    "--requests_per_minute",
+    default=60,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Request budget shared by all workers",
+)
+@click.option(
+    "--retries",
+    default=3,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Number of retries of a failed request",
+)
+@click.option(
+    "--backoff",
+    default=1.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Delay before the first retry in seconds, doubled on every next one",
+)
+@click.option(
+    "--fake_posts",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file mapping subreddits to titles, used instead of Reddit",
+)
+def get_reddit_batch_cli(
+    subreddits: tuple[str, ...],
+    num_posts: int,
+    listings: tuple[Listing, ...],
+    time_filter: Time_filter,
+    directory: str,
+    workers: int,
+    requests_per_minute: int,
+    retries: int,
+    backoff: float,
+    fake_posts: Union[str, None],
+) -> None:
+    jobs: list[ScrapeJob] = [
+        ScrapeJob(subreddit, listing, time_filter, num_posts)
+        for subreddit in dict.fromkeys(s.lower() for s in subreddits)
+        for listing in dict.fromkeys(listings)
+    ]
+    backend: Backend = (
+        FakeBackend.from_file(fake_posts) if fake_posts is not None else PrawBackend()
+    )
+
+    output_dirs: list[str] = scrape_batch(
+        jobs,
+        backend,
+        RateLimiter(requests_per_minute),
+        workers,
+        retries,
+        backoff,
+        directory,
+        create_title_tokenizer(),
+    )
+
+    print(f"All good! Data saved to {', '.join(output_dirs)}")
+
+
+if __name__ == "__main__":
+    get_reddit_batch_cli()
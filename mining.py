@@ -0,0 +1,1165 @@
+import json
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Literal, TextIO, Union
+
+from fpgrowth import Itemset, fpgrowth
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Algorithm = Union[Literal["eclat"], Literal["declat"], Literal["fpgrowth"]]
+
+# Column oriented JSON as written by pandas, with rows keyed by id
+Columns = dict[str, dict[int, Any]]
+
+# Thresholds of the automatic algorithm selection, see select_algorithm
+DECLAT_MIN_FREQUENT_DENSITY = 0.5
+FPGROWTH_MIN_FREQUENT_LENGTH = 8
+
+# Maximum number of token pairs listed at once while counting the pair
+# supports with numpy, a few int64 arrays of this length are kept per block
+PAIR_SUPPORTS_BLOCK_PAIRS = 2**20
+
+# Size above which pair supports are kept only for the pairs that occur
+# instead of the whole upper triangle of the pairs matrix
+PAIR_SUPPORTS_MAX_DENSE_BYTES = 2**30
+
+# Number of characters read at once while streaming a JSON file
+JSON_STREAM_CHUNK_SIZE = 2**20
+
+
+class TreeNode:
+    def __init__(self, tokens_ids: list[int], support: int, id_set: set[int]) -> None:
+        self.tokens_ids: list[int] = tokens_ids
+        self.tokens: list[str] = []
+        self.support: int = support
+        self.id_set: set[int] = id_set
+        self.children: list[TreeNode] = []
+
+    def __repr__(self, layer=0) -> str:
+        repr: str = "  " * layer
+        repr += f"{self.support} - {self.tokens if len(self.tokens) > 0 else self.tokens_ids}\n"
+        for child in self.children:
+            repr += f"{child.__repr__(layer + 1)}"
+
+        return repr
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TreeNode):
+            return False
+
+        return (
+            self.tokens_ids == other.tokens_ids
+            and self.support == other.support
+            and self.id_set == other.id_set
+        )
+
+    def add_child(self, child: "TreeNode") -> None:
+        self.children.append(child)
+
+    def decode(self, tokens_map: dict[int, str]) -> None:
+        self.tokens = [tokens_map[token_id] for token_id in self.tokens_ids]
+        for child in self.children:
+            child.decode(tokens_map)
+
+
+class TreeJSONEncoder(json.JSONEncoder):
+    def default(self, o: object) -> object:
+        if isinstance(o, TreeNode):
+            return o.__dict__
+        if isinstance(o, set):
+            return list(o)
+
+        return json.JSONEncoder.default(self, o)
+
+
+class IdSetsLengthStats:
+    def __init__(
+        self, num_nodes: int, min: int, max: int, avg: float, median: int
+    ) -> None:
+        self.num_nodes: int = num_nodes
+        self.min: int = min
+        self.max: int = max
+        self.avg: float = avg
+        self.median: int = median
+
+
+class DatasetProfile:
+    def __init__(
+        self,
+        num_transactions: int,
+        num_tokens: int,
+        density: float,
+        median_length: int,
+        p90_length: int,
+        num_frequent_tokens: int,
+        frequent_density: float,
+        avg_frequent_length: float,
+    ) -> None:
+        self.num_transactions: int = num_transactions
+        self.num_tokens: int = num_tokens
+        self.density: float = density
+        self.median_length: int = median_length
+        self.p90_length: int = p90_length
+        self.num_frequent_tokens: int = num_frequent_tokens
+        self.frequent_density: float = frequent_density
+        self.avg_frequent_length: float = avg_frequent_length
+
+
+class Constraints:
+    def __init__(
+        self,
+        max_length: Union[int, None] = None,
+        required_tokens_ids: list[int] = [],
+        excluded_tokens_ids: set[int] = set(),
+        allowed_tokens_ids: Union[set[int], None] = None,
+    ) -> None:
+        self.max_length: Union[int, None] = max_length
+        self.required_tokens_ids: list[int] = list(dict.fromkeys(required_tokens_ids))
+        self.excluded_tokens_ids: set[int] = excluded_tokens_ids
+        self.allowed_tokens_ids: Union[set[int], None] = allowed_tokens_ids
+
+    @staticmethod
+    def from_tokens(
+        tokens_map: dict[int, str],
+        max_length: Union[int, None] = None,
+        required_tokens: list[str] = [],
+        excluded_tokens: list[str] = [],
+        allowed_tokens: Union[list[str], None] = None,
+    ) -> "Constraints":
+        tokens_ids: dict[str, int] = {
+            token: token_id for token_id, token in tokens_map.items()
+        }
+
+        def resolve(tokens: list[str]) -> list[int]:
+            for token in tokens:
+                if token not in tokens_ids:
+                    raise ValueError(f"Token {token} not found in tokens_map.json")
+
+            return [tokens_ids[token] for token in tokens]
+
+        return Constraints(
+            max_length,
+            resolve(required_tokens),
+            set(resolve(excluded_tokens)),
+            set(resolve(allowed_tokens)) if allowed_tokens is not None else None,
+        )
+
+    def order(self, tokens_ids: Iterable[int]) -> list[int]:
+        # Required tokens go first, so every itemset containing all of them
+        # lies in the subtree of the itemset made of the required tokens only
+        # and other branches can be cut as soon as they skip a required token.
+        allowed: list[int] = [
+            token_id
+            for token_id in tokens_ids
+            if token_id not in self.excluded_tokens_ids
+            and (self.allowed_tokens_ids is None or token_id in self.allowed_tokens_ids)
+        ]
+        required: set[int] = set(self.required_tokens_ids)
+        allowed_set: set[int] = set(allowed)
+
+        return [
+            token_id for token_id in self.required_tokens_ids if token_id in allowed_set
+        ] + [token_id for token_id in allowed if token_id not in required]
+
+    def is_viable(self, tokens_ids: list[int]) -> bool:
+        # Itemset contains all required tokens or can still be extended
+        # to contain them within max_length
+        num_required: int = len(self.required_tokens_ids)
+        prefix_length: int = min(len(tokens_ids), num_required)
+        if tokens_ids[:prefix_length] != self.required_tokens_ids[:prefix_length]:
+            return False
+
+        return self.max_length is None or max(len(tokens_ids), num_required) <= (
+            self.max_length
+        )
+
+    def is_satisfied(self, tokens_ids: list[int]) -> bool:
+        return self.is_viable(tokens_ids) and len(tokens_ids) >= len(
+            self.required_tokens_ids
+        )
+
+    def can_extend(self, tokens_ids: list[int]) -> bool:
+        return self.is_viable(tokens_ids) and (
+            self.max_length is None or len(tokens_ids) < self.max_length
+        )
+
+
+class PairSupports:
+    def __init__(
+        self, indices: dict[int, int], supports: Union[Counter[int], "np.ndarray"]
+    ) -> None:
+        # Supports of the pairs of frequent tokens, stored at the position of
+        # the pair in the upper triangle of the matrix, see get_pair_offset
+        self.indices: dict[int, int] = indices
+        self.supports: Union[Counter[int], "np.ndarray"] = supports
+        self.num_skipped_joins: int = 0
+
+    def get(self, token_id: int, other_token_id: int) -> int:
+        # Tokens missing from the indices are infrequent, so are their pairs
+        index: Union[int, None] = self.indices.get(token_id)
+        other_index: Union[int, None] = self.indices.get(other_token_id)
+        if index is None or other_index is None or index == other_index:
+            return 0
+
+        return int(
+            self.supports[
+                get_pair_offset(
+                    min(index, other_index), max(index, other_index), len(self.indices)
+                )
+            ]
+        )
+
+    def can_join(self, token_id: int, other_token_id: int, min_support: int) -> bool:
+        # An itemset is never more frequent than any pair of its tokens
+        if self.get(token_id, other_token_id) > min_support:
+            return True
+
+        self.num_skipped_joins += 1
+        return False
+
+
+def read_columns(path: str) -> Columns:
+    with open(path) as file:
+        columns = json.load(file)
+
+    name: str = path.split("/")[-1]
+    if not isinstance(columns, dict) or not all(
+        isinstance(column, dict) for column in columns.values()
+    ):
+        raise ValueError(f"{name} is not a column oriented JSON")
+
+    result: Columns = {}
+    for column_name, column in columns.items():
+        try:
+            rows: list[tuple[int, Any]] = sorted(
+                (int(row_id), value) for row_id, value in column.items()
+            )
+        except ValueError:
+            raise ValueError(f"Ids in {name} are not integers")
+        result[column_name] = dict(rows)
+        if len(result[column_name]) != len(column):
+            raise ValueError(f"Duplicate ids found in {name}")
+
+    return result
+
+
+class JSONStream:
+    # Reads a JSON document value by value, holding only a chunk of the file
+    def __init__(self, file: TextIO, name: str) -> None:
+        self.file: TextIO = file
+        self.name: str = name
+        self.decoder: json.JSONDecoder = json.JSONDecoder()
+        self.buffer: str = ""
+        self.position: int = 0
+
+    def read(self) -> bool:
+        chunk: str = self.file.read(JSON_STREAM_CHUNK_SIZE)
+        if len(chunk) == 0:
+            return False
+
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        # Next character other than whitespace, empty at the end of the file
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position].isspace()
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        character: str = self.peek()
+        if character == "" or character not in characters:
+            raise ValueError(f"{self.name} is not a column oriented JSON")
+
+        self.position += 1
+        return character
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.read():
+                    raise ValueError(f"{self.name} is not a column oriented JSON")
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self.read():
+                continue
+
+            self.position = end
+            return value
+
+
+def stream_column(path: str, column_name: str) -> Iterator[tuple[int, Any]]:
+    # Rows of a single column of a column oriented JSON in the file order,
+    # without loading the whole file like read_columns
+    name: str = path.split("/")[-1]
+    found: bool = False
+    with open(path) as file:
+        stream: JSONStream = JSONStream(file, name)
+        stream.expect("{")
+        if stream.peek() == "}":
+            stream.position += 1
+        else:
+            while True:
+                key: Any = stream.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"{name} is not a column oriented JSON")
+                stream.expect(":")
+                stream.expect("{")
+                found = found or key == column_name
+
+                if stream.peek() == "}":
+                    stream.position += 1
+                else:
+                    while True:
+                        row_id: Any = stream.value()
+                        if not isinstance(row_id, str):
+                            raise ValueError(f"{name} is not a column oriented JSON")
+                        stream.expect(":")
+                        value: Any = stream.value()
+                        if key == column_name:
+                            try:
+                                parsed_row_id: int = int(row_id)
+                            except ValueError:
+                                raise ValueError(f"Ids in {name} are not integers")
+                            yield parsed_row_id, value
+                        if stream.expect(",}") == "}":
+                            break
+
+                if stream.expect(",}") == "}":
+                    break
+
+    if not found:
+        raise ValueError(f"No {column_name} column found in {name}")
+
+
+def load_json_data(directory: str) -> tuple[Columns, Columns]:
+    try:
+        tokens_map_columns = read_columns(f"{directory}/tokens_map.json")
+    except FileNotFoundError:
+        raise FileNotFoundError("No tokens_map.json file found in the directory")
+
+    try:
+        data_columns = read_columns(f"{directory}/data.json")
+    except FileNotFoundError:
+        raise FileNotFoundError("No data.json file found in the directory")
+
+    return data_columns, tokens_map_columns
+
+
+def validate_json_data(data_columns: Columns, all_tokens_ids: set[int]) -> None:
+    if "tokens" not in data_columns:
+        raise ValueError("No tokens column found in data.json")
+
+    if not all(isinstance(tokens, list) for tokens in data_columns["tokens"].values()):
+        raise ValueError("Values in tokens column are not lists")
+
+    for tokens in data_columns["tokens"].values():
+        for token in tokens:
+            if token not in all_tokens_ids:
+                raise ValueError(f"Token {token} not found in tokens_map.json")
+
+
+def validate_json_tokens_map(tokens_map_columns: Columns) -> None:
+    if "token" not in tokens_map_columns:
+        raise ValueError("No token column found in tokens_map.json")
+
+    tokens: list[Any] = list(tokens_map_columns["token"].values())
+    if not all(isinstance(token, str) for token in tokens):
+        raise ValueError("Values in token column are not strings")
+
+    if len(tokens) != len(set(tokens)):
+        raise ValueError("Duplicate tokens found in tokens_map.json")
+
+
+def deduplicate_transactions(
+    data: dict[int, list[int]],
+) -> tuple[dict[int, list[int]], dict[int, int], dict[int, list[int]]]:
+    # Identical transactions are merged into the first one of them, weighted
+    # by the number of copies. The map keeps every merged transaction id.
+    representatives: dict[frozenset[int], int] = {}
+    unique_data: dict[int, list[int]] = {}
+    transactions_ids_map: dict[int, list[int]] = {}
+    for transaction_id, tokens_ids in data.items():
+        key: frozenset[int] = frozenset(tokens_ids)
+        if key not in representatives:
+            representatives[key] = transaction_id
+            unique_data[transaction_id] = tokens_ids
+            transactions_ids_map[transaction_id] = []
+        transactions_ids_map[representatives[key]].append(transaction_id)
+
+    weights: dict[int, int] = {
+        transaction_id: len(transactions_ids)
+        for transaction_id, transactions_ids in transactions_ids_map.items()
+    }
+
+    return unique_data, weights, transactions_ids_map
+
+
+def get_weight(id_set: set[int], weights: Union[dict[int, int], None]) -> int:
+    if weights is None:
+        return len(id_set)
+
+    return sum(weights[transaction_id] for transaction_id in id_set)
+
+
+def get_pair_offset(index: int, other_index: int, num_tokens: int) -> int:
+    # Position of the pair (index, other_index), index < other_index, in the
+    # upper triangle of the pairs matrix flattened row by row
+    return index * (2 * num_tokens - index - 1) // 2 + other_index - index - 1
+
+
+def count_pairs(rows: list[tuple[list[int], int]], num_tokens: int) -> Counter[int]:
+    # Only pairs occurring together are stored
+    supports: Counter[int] = Counter()
+    for indices, weight in rows:
+        indices = sorted(indices)
+        for position, index in enumerate(indices):
+            for other_index in indices[position + 1 :]:
+                supports[get_pair_offset(index, other_index, num_tokens)] += weight
+
+    return supports
+
+
+def split_pair_blocks(
+    rows: list[tuple[list[int], int]],
+) -> Iterator[list[tuple[list[int], int]]]:
+    # Blocks list at most PAIR_SUPPORTS_BLOCK_PAIRS ordered pairs, a longer
+    # transaction is a block of its own
+    start: int = 0
+    num_pairs: int = 0
+    for end, (indices, _) in enumerate(rows):
+        row_pairs: int = len(indices) ** 2
+        if end > start and num_pairs + row_pairs > PAIR_SUPPORTS_BLOCK_PAIRS:
+            yield rows[start:end]
+            start, num_pairs = end, 0
+        num_pairs += row_pairs
+
+    if start < len(rows):
+        yield rows[start:]
+
+
+def list_pair_offsets(
+    rows: list[tuple[list[int], int]], num_tokens: int
+) -> Iterator[tuple["np.ndarray", "np.ndarray"]]:
+    import numpy as np
+
+    # Every index of a transaction is paired with every other one of it,
+    # yields the offsets of the pairs and their weights block by block
+    for block in split_pair_blocks(rows):
+        lengths = np.array([len(indices) for indices, _ in block], dtype=np.int64)
+        indices = np.fromiter(
+            (index for row_indices, _ in block for index in row_indices),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        entry_lengths = np.repeat(lengths, lengths)
+        entry_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pair_starts = np.cumsum(entry_lengths) - entry_lengths
+        offsets = np.arange(int(entry_lengths.sum())) - np.repeat(
+            pair_starts, entry_lengths
+        )
+
+        left = np.repeat(indices, entry_lengths)
+        right = indices[np.repeat(entry_starts, entry_lengths) + offsets]
+        pair_weights = np.repeat(
+            np.repeat(np.array([weight for _, weight in block]), lengths),
+            entry_lengths,
+        )
+        is_ordered = left < right
+        left, right = left[is_ordered], right[is_ordered]
+        yield (
+            left * (2 * num_tokens - left - 1) // 2 + right - left - 1,
+            pair_weights[is_ordered],
+        )
+
+
+def count_pairs_numpy(
+    rows: list[tuple[list[int], int]], num_tokens: int
+) -> Union[Counter[int], "np.ndarray"]:
+    import numpy as np
+
+    # The upper triangle of the pairs matrix takes 4 * num_tokens ** 2 bytes,
+    # past PAIR_SUPPORTS_MAX_DENSE_BYTES only the pairs that occur are kept
+    num_pairs: int = num_tokens * (num_tokens - 1) // 2
+    if num_pairs * 8 <= PAIR_SUPPORTS_MAX_DENSE_BYTES:
+        supports = np.zeros(num_pairs, dtype=np.int64)
+        for offsets, pair_weights in list_pair_offsets(rows, num_tokens):
+            np.add.at(supports, offsets, pair_weights)
+
+        return supports
+
+    def sum_pairs(offsets, pair_weights):
+        offsets, inverse = np.unique(offsets, return_inverse=True)
+        sums = np.bincount(inverse, weights=pair_weights, minlength=len(offsets))
+        return offsets, sums.astype(np.int64)
+
+    # Blocks are summed once they outgrow the pairs summed so far, which
+    # keeps at most about twice the number of occurring pairs besides a block
+    counted: tuple = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    pending: list[tuple] = []
+    num_pending: int = 0
+    for offsets, pair_weights in list_pair_offsets(rows, num_tokens):
+        pending.append(sum_pairs(offsets, pair_weights))
+        num_pending += len(pending[-1][0])
+        if num_pending > len(counted[0]):
+            counted = sum_pairs(*map(np.concatenate, zip(counted, *pending)))
+            pending, num_pending = [], 0
+
+    if len(pending) > 0:
+        counted = sum_pairs(*map(np.concatenate, zip(counted, *pending)))
+
+    return Counter(dict(zip(counted[0].tolist(), counted[1].tolist())))
+
+
+def build_pair_supports(
+    data: dict[int, list[int]],
+    min_support: int,
+    weights: Union[dict[int, int], None] = None,
+) -> PairSupports:
+    token_supports: dict[int, int] = {}
+    for transaction_id, tokens_ids in data.items():
+        for token_id in set(tokens_ids):
+            token_supports[token_id] = token_supports.get(token_id, 0) + (
+                1 if weights is None else weights[transaction_id]
+            )
+
+    # Only frequent tokens are ever joined, so the others are left out
+    indices: dict[int, int] = {
+        token_id: index
+        for index, token_id in enumerate(
+            sorted(
+                token_id
+                for token_id, support in token_supports.items()
+                if support > min_support
+            )
+        )
+    }
+    rows: list[tuple[list[int], int]] = [
+        (
+            [indices[token_id] for token_id in set(tokens_ids) if token_id in indices],
+            1 if weights is None else weights[transaction_id],
+        )
+        for transaction_id, tokens_ids in data.items()
+    ]
+
+    supports: Union[Counter[int], "np.ndarray"]
+    try:
+        supports = count_pairs_numpy(rows, len(indices))
+    except ImportError:
+        supports = count_pairs(rows, len(indices))
+
+    return PairSupports(indices, supports)
+
+
+# DECLAT
+def get_dif_sets_map(
+    data: dict[int, list[int]], all_tokens_ids: set[int]
+) -> dict[int, set[int]]:
+    dif_map: dict[int, set[int]] = {token_id: set() for token_id in all_tokens_ids}
+    for transaction_id, tokens_ids in data.items():
+        non_existing_tokens_ids: set[int] = all_tokens_ids - set(tokens_ids)
+        for token_id in non_existing_tokens_ids:
+            dif_map[token_id].add(transaction_id)
+
+    return dif_map
+
+
+def build_declat_root(
+    id_sets_map: dict[int, set[int]],
+    num_transactions: int,
+    min_support: int,
+    id_sets_lengths: list[int] = [],
+    constraints: Union[Constraints, None] = None,
+    layer: Union[list[TreeNode], None] = None,
+    weights: Union[dict[int, int], None] = None,
+) -> TreeNode:
+    declat_tree: TreeNode = TreeNode([], num_transactions, set())
+    tokens_ids: Iterable[int] = (
+        constraints.order(id_sets_map.keys()) if constraints else id_sets_map.keys()
+    )
+
+    for token_id in tokens_ids:
+        dif_list: set[int] = id_sets_map[token_id]
+        node_support: int = num_transactions - (
+            len(dif_list) if weights is None else get_weight(dif_list, weights)
+        )
+        if node_support > min_support:
+            node: TreeNode = TreeNode([token_id], node_support, dif_list)
+            if layer is not None:
+                layer.append(node)
+            if constraints is None or constraints.is_viable(node.tokens_ids):
+                id_sets_lengths.append(len(dif_list))
+                declat_tree.add_child(node)
+
+    return declat_tree
+
+
+def build_declat_tree(
+    layer: list[TreeNode],
+    min_support,
+    id_sets_lengths: list[int] = [],
+    constraints: Union[Constraints, None] = None,
+    weights: Union[dict[int, int], None] = None,
+    pair_supports: Union[PairSupports, None] = None,
+) -> None:
+    if len(layer) == 0:
+        return
+
+    new_layer: list[TreeNode] = []
+
+    for i, node in enumerate(layer):
+        if constraints is not None and not constraints.can_extend(node.tokens_ids):
+            continue
+
+        for other_node in layer[i + 1 :]:
+            if node.tokens_ids[:-1] == other_node.tokens_ids[:-1]:
+                if pair_supports is not None and not pair_supports.can_join(
+                    node.tokens_ids[-1], other_node.tokens_ids[-1], min_support
+                ):
+                    continue
+
+                new_id_set: set[int] = other_node.id_set - node.id_set
+                new_support: int = node.support - (
+                    len(new_id_set)
+                    if weights is None
+                    else get_weight(new_id_set, weights)
+                )
+                if new_support > min_support:
+                    new_node: TreeNode = TreeNode(
+                        node.tokens_ids + [other_node.tokens_ids[-1]],
+                        new_support,
+                        new_id_set,
+                    )
+                    # Nodes breaking the constraints are kept in the layer
+                    # only to be joined with their siblings
+                    new_layer.append(new_node)
+                    if constraints is None or constraints.is_viable(
+                        new_node.tokens_ids
+                    ):
+                        id_sets_lengths.append(len(new_id_set))
+                        node.add_child(new_node)
+
+    build_declat_tree(
+        new_layer, min_support, id_sets_lengths, constraints, weights, pair_supports
+    )
+
+
+# ECLAT
+def get_tid_sets_map(
+    data: dict[int, list[int]], all_tokens_ids: set[int]
+) -> dict[int, set[int]]:
+    tid_map: dict[int, set[int]] = {token_id: set() for token_id in all_tokens_ids}
+    for transaction_id, tokens_ids in data.items():
+        for token_id in tokens_ids:
+            tid_map[token_id].add(transaction_id)
+
+    return tid_map
+
+
+def build_eclat_root(
+    id_sets_map: dict[int, set[int]],
+    min_support: int,
+    all_transaction_ids: set[int],
+    id_sets_lengths: list[int] = [],
+    constraints: Union[Constraints, None] = None,
+    layer: Union[list[TreeNode], None] = None,
+    weights: Union[dict[int, int], None] = None,
+) -> TreeNode:
+    eclat_tree: TreeNode = TreeNode(
+        [], get_weight(all_transaction_ids, weights), all_transaction_ids
+    )
+    tokens_ids: Iterable[int] = (
+        constraints.order(id_sets_map.keys()) if constraints else id_sets_map.keys()
+    )
+
+    for token_id in tokens_ids:
+        tid_list: set[int] = id_sets_map[token_id]
+        node_support: int = (
+            len(tid_list) if weights is None else get_weight(tid_list, weights)
+        )
+        if node_support > min_support:
+            node: TreeNode = TreeNode([token_id], node_support, tid_list)
+            if layer is not None:
+                layer.append(node)
+            if constraints is None or constraints.is_viable(node.tokens_ids):
+                id_sets_lengths.append(len(tid_list))
+                eclat_tree.add_child(node)
+
+    return eclat_tree
+
+
+def build_eclat_tree(
+    layer: list[TreeNode],
+    min_support,
+    id_sets_lengths: list[int] = [],
+    constraints: Union[Constraints, None] = None,
+    weights: Union[dict[int, int], None] = None,
+    pair_supports: Union[PairSupports, None] = None,
+) -> None:
+    if len(layer) == 0:
+        return
+
+    new_layer: list[TreeNode] = []
+
+    for i, node in enumerate(layer):
+        if constraints is not None and not constraints.can_extend(node.tokens_ids):
+            continue
+
+        for other_node in layer[i + 1 :]:
+            if node.tokens_ids[:-1] == other_node.tokens_ids[:-1]:
+                if pair_supports is not None and not pair_supports.can_join(
+                    node.tokens_ids[-1], other_node.tokens_ids[-1], min_support
+                ):
+                    continue
+
+                new_id_set: set[int] = node.id_set & other_node.id_set
+                new_support: int = (
+                    len(new_id_set)
+                    if weights is None
+                    else get_weight(new_id_set, weights)
+                )
+                if new_support > min_support:
+                    new_node: TreeNode = TreeNode(
+                        node.tokens_ids + [other_node.tokens_ids[-1]],
+                        new_support,
+                        new_id_set,
+                    )
+                    # Nodes breaking the constraints are kept in the layer
+                    # only to be joined with their siblings
+                    new_layer.append(new_node)
+                    if constraints is None or constraints.is_viable(
+                        new_node.tokens_ids
+                    ):
+                        id_sets_lengths.append(len(new_id_set))
+                        node.add_child(new_node)
+
+    build_eclat_tree(
+        new_layer, min_support, id_sets_lengths, constraints, weights, pair_supports
+    )
+
+
+def save_tree(
+    declat_tree: TreeNode,
+    directory: str,
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_length_stats: IdSetsLengthStats,
+) -> None:
+    result = {
+        "min_support": min_support,
+        "id_sets_length_stats": id_sets_length_stats.__dict__,
+        "tree": declat_tree,
+    }
+    with open(f"{directory}/{algorithm}.json", "w") as file:
+        json.dump(result, file, indent=2, cls=TreeJSONEncoder)
+
+
+def calculate_statistics(id_sets_lengths: list[int]) -> IdSetsLengthStats:
+    id_sets_lengths.sort()
+    num_id_sets: int = len(id_sets_lengths)
+    return IdSetsLengthStats(
+        num_nodes=num_id_sets,
+        min=id_sets_lengths[0] if num_id_sets > 0 else 0,
+        max=id_sets_lengths[-1] if num_id_sets > 0 else 0,
+        avg=sum(id_sets_lengths) / num_id_sets if num_id_sets > 0 else 0,
+        median=id_sets_lengths[num_id_sets // 2] if num_id_sets > 0 else 0,
+    )
+
+
+def load_transactions(directory: str) -> tuple[dict[int, list[int]], dict[int, str]]:
+    print("Reading data...")
+    data_columns, tokens_map_columns = load_json_data(directory)
+
+    print("Validating tokens_map.json...")
+    validate_json_tokens_map(tokens_map_columns)
+    tokens_map: dict[int, str] = tokens_map_columns["token"]
+
+    print("Validating data.json...")
+    validate_json_data(data_columns, set(tokens_map.keys()))
+    data: dict[int, list[int]] = data_columns["tokens"]
+
+    return data, tokens_map
+
+
+def get_id_sets_map(
+    data: dict[int, list[int]], all_tokens_ids: set[int], algorithm: Algorithm
+) -> dict[int, set[int]]:
+    if algorithm == "declat":
+        print("Creating dif-sets...")
+        return get_dif_sets_map(data, all_tokens_ids)
+    elif algorithm in ("eclat", "fpgrowth"):
+        print("Creating tid-sets...")
+        return get_tid_sets_map(data, all_tokens_ids)
+    else:
+        raise ValueError(f"Unknown algorithm {algorithm}")
+
+
+def profile_dataset(data: dict[int, list[int]], min_support: int) -> DatasetProfile:
+    supports: dict[int, int] = {}
+    lengths: list[int] = []
+    for tokens_ids in data.values():
+        unique_tokens_ids: set[int] = set(tokens_ids)
+        lengths.append(len(unique_tokens_ids))
+        for token_id in unique_tokens_ids:
+            supports[token_id] = supports.get(token_id, 0) + 1
+
+    frequent_supports: list[int] = [
+        support for support in supports.values() if support > min_support
+    ]
+    num_transactions: int = len(data)
+    lengths.sort()
+
+    return DatasetProfile(
+        num_transactions=num_transactions,
+        num_tokens=len(supports),
+        density=(
+            sum(lengths) / (num_transactions * len(supports))
+            if len(supports) > 0
+            else 0
+        ),
+        median_length=lengths[num_transactions // 2] if num_transactions > 0 else 0,
+        p90_length=lengths[(num_transactions * 9) // 10] if num_transactions > 0 else 0,
+        num_frequent_tokens=len(frequent_supports),
+        frequent_density=(
+            sum(frequent_supports) / (num_transactions * len(frequent_supports))
+            if len(frequent_supports) > 0
+            else 0
+        ),
+        avg_frequent_length=(
+            sum(frequent_supports) / num_transactions if num_transactions > 0 else 0
+        ),
+    )
+
+
+def select_algorithm(profile: DatasetProfile) -> tuple[Algorithm, str]:
+    # Only frequent tokens take part in the joins. A dif-set is shorter than
+    # the tid-set once the token occurs in more than half of the transactions.
+    if profile.frequent_density > DECLAT_MIN_FREQUENT_DENSITY:
+        return "declat", (
+            f"frequent tokens occur in {profile.frequent_density:.0%} of "
+            "transactions on average, so dif-sets are shorter than tid-sets"
+        )
+
+    # Many frequent tokens per transaction mean long frequent itemsets,
+    # where FP-growth avoids the number of tid-set joins growing with them
+    if profile.avg_frequent_length >= FPGROWTH_MIN_FREQUENT_LENGTH:
+        return "fpgrowth", (
+            f"transactions contain {profile.avg_frequent_length:.1f} frequent "
+            "tokens on average, so long frequent itemsets are expected"
+        )
+
+    return "eclat", (
+        f"sparse dataset, frequent tokens occur in {profile.frequent_density:.0%} "
+        f"of transactions and transactions contain "
+        f"{profile.avg_frequent_length:.1f} of them on average"
+    )
+
+
+def resolve_algorithm(
+    data: dict[int, list[int]],
+    min_support: int,
+    algorithm: Union[Algorithm, Literal["auto"]],
+) -> Algorithm:
+    if algorithm != "auto":
+        return algorithm
+
+    print("Profiling dataset...")
+    profile: DatasetProfile = profile_dataset(data, min_support)
+    print(
+        f"{profile.num_transactions} transactions, {profile.num_tokens} tokens, "
+        f"density {profile.density:.4f}, transaction length median "
+        f"{profile.median_length} and 90th percentile {profile.p90_length}, "
+        f"{profile.num_frequent_tokens} frequent tokens"
+    )
+
+    selected_algorithm, reason = select_algorithm(profile)
+    print(f"Selected {selected_algorithm}: {reason}")
+
+    return selected_algorithm
+
+
+def remove_unsatisfied_leaves(tree: TreeNode, constraints: Constraints) -> None:
+    # Prefixes of the required tokens whose extensions turned out infrequent
+    for child in tree.children:
+        remove_unsatisfied_leaves(child, constraints)
+
+    tree.children = [
+        child
+        for child in tree.children
+        if len(child.children) > 0 or constraints.is_satisfied(child.tokens_ids)
+    ]
+
+
+def grow_tree(
+    id_sets_map: dict[int, set[int]],
+    all_transaction_ids: set[int],
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_lengths: list[int],
+    constraints: Union[Constraints, None] = None,
+    weights: Union[dict[int, int], None] = None,
+    pair_supports: Union[PairSupports, None] = None,
+) -> TreeNode:
+    layer: list[TreeNode] = []
+
+    if algorithm == "declat":
+        print(f"Building {algorithm} root...")
+        tree: TreeNode = build_declat_root(
+            id_sets_map,
+            get_weight(all_transaction_ids, weights),
+            min_support,
+            id_sets_lengths,
+            constraints,
+            layer,
+            weights,
+        )
+
+        print(f"Building {algorithm} tree...")
+        build_declat_tree(
+            layer, min_support, id_sets_lengths, constraints, weights, pair_supports
+        )
+    elif algorithm == "eclat":
+        print(f"Building {algorithm} root...")
+        tree = build_eclat_root(
+            id_sets_map,
+            min_support,
+            all_transaction_ids,
+            id_sets_lengths,
+            constraints,
+            layer,
+            weights,
+        )
+
+        print(f"Building {algorithm} tree...")
+        build_eclat_tree(
+            layer, min_support, id_sets_lengths, constraints, weights, pair_supports
+        )
+    else:
+        raise ValueError(f"Unknown algorithm {algorithm}")
+
+    if constraints is not None:
+        remove_unsatisfied_leaves(tree, constraints)
+        id_sets_lengths.clear()
+        collect_id_sets_lengths(tree, id_sets_lengths)
+
+    return tree
+
+
+def grow_fpgrowth_tree(
+    data: dict[int, list[int]],
+    tid_sets_map: dict[int, set[int]],
+    min_support: int,
+    id_sets_lengths: list[int],
+    constraints: Union[Constraints, None] = None,
+    weights: Union[dict[int, int], None] = None,
+) -> TreeNode:
+    # Frequent itemsets are laid out as in the Eclat tree, so tid-sets are
+    # intersected only for frequent itemsets and not for every candidate
+    tokens_ids: list[int] = (
+        constraints.order(tid_sets_map.keys())
+        if constraints
+        else list(tid_sets_map.keys())
+    )
+    ranks: dict[int, int] = {token_id: rank for rank, token_id in enumerate(tokens_ids)}
+
+    all_transaction_ids: set[int] = set(data.keys())
+    tree: TreeNode = TreeNode(
+        [], get_weight(all_transaction_ids, weights), all_transaction_ids
+    )
+    nodes: dict[Itemset, TreeNode] = {(): tree}
+
+    # Required tokens form a chain of prefixes, FP-growth then mines only
+    # the transactions containing all of them for the remaining tokens
+    required_tokens_ids: list[int] = []
+    max_length: Union[int, None] = None
+    if constraints is not None:
+        required_tokens_ids = constraints.required_tokens_ids
+        max_length = constraints.max_length
+        if max_length is not None and len(required_tokens_ids) > max_length:
+            return tree
+
+    prefix: Itemset = ()
+    for token_id in required_tokens_ids:
+        if token_id not in ranks:
+            break
+
+        parent: TreeNode = nodes[prefix]
+        id_set: set[int] = parent.id_set & tid_sets_map[token_id]
+        support: int = get_weight(id_set, weights)
+        if support <= min_support:
+            break
+
+        prefix += (token_id,)
+        node: TreeNode = TreeNode(list(prefix), support, id_set)
+        parent.add_child(node)
+        nodes[prefix] = node
+        id_sets_lengths.append(len(id_set))
+
+    itemsets: dict[Itemset, int] = {}
+    if max_length is not None:
+        max_length -= len(prefix)
+
+    if len(prefix) == len(required_tokens_ids) and (
+        max_length is None or max_length > 0
+    ):
+        if constraints is not None:
+            data = {
+                transaction_id: [
+                    token_id
+                    for token_id in data[transaction_id]
+                    if token_id in ranks and token_id not in prefix
+                ]
+                for transaction_id in nodes[prefix].id_set
+            }
+
+        print(f"Growing FP-tree on {len(data)} transactions...")
+        itemsets = fpgrowth(data, min_support, max_length, weights)
+
+    print("Building fpgrowth tree...")
+    supports: dict[Itemset, int] = {
+        prefix + tuple(sorted(itemset, key=ranks.__getitem__)): support
+        for itemset, support in itemsets.items()
+    }
+    # Parents before children and siblings ordered as in the first level
+    ordered_itemsets: list[Itemset] = sorted(
+        supports,
+        key=lambda itemset: (len(itemset), [ranks[token_id] for token_id in itemset]),
+    )
+    for itemset in ordered_itemsets:
+        parent = nodes[itemset[:-1]]
+        node = TreeNode(
+            list(itemset),
+            supports[itemset],
+            parent.id_set & tid_sets_map[itemset[-1]],
+        )
+        parent.add_child(node)
+        nodes[itemset] = node
+        id_sets_lengths.append(len(node.id_set))
+
+    if constraints is not None:
+        remove_unsatisfied_leaves(tree, constraints)
+        id_sets_lengths.clear()
+        collect_id_sets_lengths(tree, id_sets_lengths)
+
+    return tree
+
+
+def collect_id_sets_lengths(tree: TreeNode, id_sets_lengths: list[int]) -> None:
+    for child in tree.children:
+        id_sets_lengths.append(len(child.id_set))
+        collect_id_sets_lengths(child, id_sets_lengths)
+
+
+def expand_id_sets(tree: TreeNode, transactions_ids_map: dict[int, list[int]]) -> None:
+    # Replaces merged transactions with all their copies, which gives the
+    # id-sets of mining the data without deduplication
+    tree.id_set = {
+        transaction_id
+        for merged_transaction_id in tree.id_set
+        for transaction_id in transactions_ids_map[merged_transaction_id]
+    }
+    for child in tree.children:
+        expand_id_sets(child, transactions_ids_map)
+
+
+def mine_tree(
+    data: dict[int, list[int]],
+    tokens_map: dict[int, str],
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_map: Union[dict[int, set[int]], None] = None,
+    constraints: Union[Constraints, None] = None,
+    deduplicate: bool = False,
+    prune_pairs: bool = False,
+) -> tuple[TreeNode, IdSetsLengthStats]:
+    weights: Union[dict[int, int], None] = None
+    transactions_ids_map: Union[dict[int, list[int]], None] = None
+    if deduplicate:
+        if id_sets_map is not None:
+            raise ValueError("id_sets_map cannot be reused with deduplication")
+
+        print("Deduplicating transactions...")
+        num_transactions: int = len(data)
+        data, weights, transactions_ids_map = deduplicate_transactions(data)
+        print(f"Merged {num_transactions} transactions into {len(data)} unique ones")
+
+    if id_sets_map is None:
+        id_sets_map = get_id_sets_map(data, set(tokens_map.keys()), algorithm)
+
+    id_sets_lengths: list[int] = []
+    if algorithm == "fpgrowth":
+        tree: TreeNode = grow_fpgrowth_tree(
+            data, id_sets_map, min_support, id_sets_lengths, constraints, weights
+        )
+    else:
+        pair_supports: Union[PairSupports, None] = None
+        if prune_pairs:
+            print("Counting 2-itemset supports...")
+            pair_supports = build_pair_supports(data, min_support, weights)
+
+        tree = grow_tree(
+            id_sets_map,
+            set(data.keys()),
+            min_support,
+            algorithm,
+            id_sets_lengths,
+            constraints,
+            weights,
+            pair_supports,
+        )
+
+        if pair_supports is not None:
+            print(
+                f"Skipped {pair_supports.num_skipped_joins} joins "
+                "failing the 2-itemset supports"
+            )
+
+    if transactions_ids_map is not None:
+        print("Expanding id-sets...")
+        expand_id_sets(tree, transactions_ids_map)
+        id_sets_lengths.clear()
+        collect_id_sets_lengths(tree, id_sets_lengths)
+
+    print("Decoding tokens...")
+    tree.decode(tokens_map)
+
+    print("Calculating statistics...")
+    statistics: IdSetsLengthStats = calculate_statistics(id_sets_lengths)
+
+    return tree, statistics
+
+
+def create_constraints(
+    tokens_map: dict[int, str],
+    max_length: Union[int, None] = None,
+    required_tokens: list[str] = [],
+    excluded_tokens: list[str] = [],
+    allowed_tokens: Union[list[str], None] = None,
+) -> Union[Constraints, None]:
+    if (
+        max_length is None
+        and len(required_tokens) == 0
+        and len(excluded_tokens) == 0
+        and allowed_tokens is None
+    ):
+        return None
+
+    return Constraints.from_tokens(
+        tokens_map, max_length, required_tokens, excluded_tokens, allowed_tokens
+    )
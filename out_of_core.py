@@ -0,0 +1,413 @@
+import json
+import tempfile
+import textwrap
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+import click
+
+from mining import (
+    Algorithm,
+    IdSetsLengthStats,
+    TreeJSONEncoder,
+    TreeNode,
+    build_declat_tree,
+    build_eclat_tree,
+    calculate_statistics,
+    read_columns,
+    stream_column,
+    validate_json_tokens_map,
+)
+
+# Rough memory footprint of a single transaction id stored in a Python set
+# (the int object plus its share of the hash table).
+ID_SET_ENTRY_BYTES = 64
+
+CHILDREN_PLACEHOLDER = "__CHILDREN__"
+
+
+class Partition:
+    def __init__(self, index: int, tokens_ids: list[int], first_rank: int) -> None:
+        self.index: int = index
+        self.tokens_ids: list[int] = tokens_ids
+        self.first_rank: int = first_rank
+        self.estimated_bytes: int = 0
+
+
+def load_tokens_map(directory: str) -> dict[int, str]:
+    try:
+        tokens_map_columns = read_columns(f"{directory}/tokens_map.json")
+    except FileNotFoundError:
+        raise FileNotFoundError("No tokens_map.json file found in the directory")
+
+    validate_json_tokens_map(tokens_map_columns)
+    return tokens_map_columns["token"]
+
+
+def iterate_transactions(
+    directory: str, all_tokens_ids: set[int]
+) -> Iterator[tuple[int, list[int]]]:
+    # data.json is streamed on every pass instead of being kept in memory
+    if not Path(f"{directory}/data.json").is_file():
+        raise FileNotFoundError("No data.json file found in the directory")
+
+    for transaction_id, tokens_ids in stream_column(f"{directory}/data.json", "tokens"):
+        if not isinstance(tokens_ids, list):
+            raise ValueError("Values in tokens column are not lists")
+        for token_id in tokens_ids:
+            if token_id not in all_tokens_ids:
+                raise ValueError(f"Token {token_id} not found in tokens_map.json")
+
+        yield transaction_id, tokens_ids
+
+
+def count_supports(
+    transactions: Iterable[tuple[int, list[int]]], all_transaction_ids: set[int]
+) -> Counter[int]:
+    supports: Counter[int] = Counter()
+    for transaction_id, tokens_ids in transactions:
+        if transaction_id in all_transaction_ids:
+            raise ValueError("Duplicate ids found in data.json")
+
+        all_transaction_ids.add(transaction_id)
+        supports.update(set(tokens_ids))
+
+    return supports
+
+
+def get_frequent_tokens_ids(
+    supports: Counter[int], all_tokens_ids: set[int], min_support: int
+) -> list[int]:
+    # Same order as the first level built by build_eclat_root/build_declat_root
+    return [token_id for token_id in all_tokens_ids if supports[token_id] > min_support]
+
+
+def get_projection_weights(
+    transactions: Iterable[tuple[int, list[int]]], ranks: dict[int, int]
+) -> dict[int, int]:
+    # Number of id-set entries needed to mine the equivalence class of a token,
+    # that is, occurrences of the token and of all tokens ranked after it
+    # in the transactions containing it. dEclat fits in the same bound, as its
+    # first level keeps tid-sets until written, see mine_partition.
+    weights: dict[int, int] = {token_id: 0 for token_id in ranks}
+    for _, tokens_ids in transactions:
+        ranked: list[int] = sorted(
+            (token_id for token_id in tokens_ids if token_id in ranks),
+            key=ranks.__getitem__,
+        )
+        for position, token_id in enumerate(ranked):
+            weights[token_id] += len(ranked) - position
+
+    return weights
+
+
+def create_partitions(
+    frequent_tokens_ids: list[int], weights: dict[int, int], memory_budget: int
+) -> list[Partition]:
+    partitions: list[Partition] = []
+    current: Union[Partition, None] = None
+
+    for rank, token_id in enumerate(frequent_tokens_ids):
+        token_bytes: int = weights[token_id] * ID_SET_ENTRY_BYTES
+        if current is None or current.estimated_bytes + token_bytes > memory_budget:
+            current = Partition(len(partitions), [], rank)
+            partitions.append(current)
+
+        current.tokens_ids.append(token_id)
+        current.estimated_bytes += token_bytes
+
+    return partitions
+
+
+def spill_partitions(
+    transactions: Iterable[tuple[int, list[int]]],
+    ranks: dict[int, int],
+    partitions: list[Partition],
+    spill_directory: Path,
+) -> None:
+    partition_of: dict[int, Partition] = {
+        token_id: partition
+        for partition in partitions
+        for token_id in partition.tokens_ids
+    }
+    files = [
+        open(spill_directory / f"partition_{partition.index}.data.jsonl", "w")
+        for partition in partitions
+    ]
+
+    try:
+        for transaction_id, tokens_ids in transactions:
+            ranked: list[int] = sorted(
+                (token_id for token_id in tokens_ids if token_id in ranks),
+                key=ranks.__getitem__,
+            )
+            written: set[int] = set()
+            for position, token_id in enumerate(ranked):
+                partition: Partition = partition_of[token_id]
+                if partition.index in written:
+                    continue
+
+                written.add(partition.index)
+                files[partition.index].write(
+                    json.dumps([transaction_id, ranked[position:]]) + "\n"
+                )
+    finally:
+        for file in files:
+            file.close()
+
+
+def load_partition(spill_directory: Path, partition: Partition) -> Iterator[list]:
+    with open(spill_directory / f"partition_{partition.index}.data.jsonl") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def mine_partition(
+    projected_data: dict[int, list[int]],
+    partition: Partition,
+    candidate_tokens_ids: list[int],
+    supports: Counter[int],
+    all_transaction_ids: set[int],
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_lengths: list[int],
+) -> list[TreeNode]:
+    projected_tokens_ids: set[int] = {
+        token_id for tokens_ids in projected_data.values() for token_id in tokens_ids
+    }
+    tid_sets_map: dict[int, set[int]] = {
+        token_id: set() for token_id in projected_tokens_ids
+    }
+    for transaction_id, tokens_ids in projected_data.items():
+        for token_id in tokens_ids:
+            tid_sets_map[token_id].add(transaction_id)
+
+    first_layer: list[TreeNode] = []
+    second_layer: list[TreeNode] = []
+
+    for position, token_id in enumerate(partition.tokens_ids):
+        tid_set: set[int] = tid_sets_map[token_id]
+        # dEclat first level dif-sets hold nearly every transaction id, so the
+        # tid-set is kept instead and converted only when the node is written
+        node: TreeNode = TreeNode([token_id], supports[token_id], tid_set)
+        id_sets_lengths.append(
+            len(all_transaction_ids) - len(tid_set)
+            if algorithm == "declat"
+            else len(tid_set)
+        )
+        first_layer.append(node)
+
+        for other_token_id in candidate_tokens_ids[position + 1 :]:
+            other_tid_set: set[int] = tid_sets_map.get(other_token_id, set())
+            new_id_set: set[int]
+            if algorithm == "declat":
+                new_id_set = tid_set - other_tid_set
+                new_support: int = node.support - len(new_id_set)
+            else:
+                new_id_set = tid_set & other_tid_set
+                new_support = len(new_id_set)
+
+            if new_support > min_support:
+                id_sets_lengths.append(len(new_id_set))
+                new_node: TreeNode = TreeNode(
+                    node.tokens_ids + [other_token_id], new_support, new_id_set
+                )
+                node.add_child(new_node)
+                second_layer.append(new_node)
+
+        del tid_sets_map[token_id]
+
+    if algorithm == "declat":
+        build_declat_tree(second_layer, min_support, id_sets_lengths)
+    else:
+        build_eclat_tree(second_layer, min_support, id_sets_lengths)
+
+    return first_layer
+
+
+def save_tree_out_of_core(
+    root: TreeNode,
+    subtree_files: list[Path],
+    directory: str,
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_length_stats: IdSetsLengthStats,
+) -> None:
+    # Writes the same document as save_tree, streaming first level subtrees
+    # from the spill files instead of holding the whole tree in memory.
+    root.children = [CHILDREN_PLACEHOLDER]  # type: ignore[list-item]
+    result = {
+        "min_support": min_support,
+        "id_sets_length_stats": id_sets_length_stats.__dict__,
+        "tree": root,
+    }
+    document: str = json.dumps(result, indent=2, cls=TreeJSONEncoder)
+    root.children = []
+
+    placeholder_line: str = f'{" " * 6}"{CHILDREN_PLACEHOLDER}"'
+    head, tail = document.split(placeholder_line)
+
+    with open(f"{directory}/{algorithm}.json", "w") as file:
+        first: bool = True
+        for subtree_file in subtree_files:
+            with open(subtree_file) as subtree_lines:
+                for line in subtree_lines:
+                    file.write(head if first else ",\n")
+                    first = False
+                    subtree: str = json.dumps(json.loads(line), indent=2)
+                    file.write(textwrap.indent(subtree, " " * 6))
+
+        if first:
+            file.write(head.rstrip().rstrip("[").rstrip() + " []")
+            file.write(tail.lstrip().lstrip("]"))
+        else:
+            file.write(tail)
+
+
+def build_tree_out_of_core(
+    directory: str,
+    min_support: int,
+    algorithm: Algorithm,
+    memory_budget: int,
+    spill_directory: Union[str, None] = None,
+) -> IdSetsLengthStats:
+    if algorithm not in ("eclat", "declat"):
+        raise ValueError(f"Unknown algorithm {algorithm}")
+
+    tokens_map: dict[int, str] = load_tokens_map(directory)
+    all_tokens_ids: set[int] = set(tokens_map.keys())
+
+    print("Counting supports...")
+    all_transaction_ids: set[int] = set()
+    supports: Counter[int] = count_supports(
+        iterate_transactions(directory, all_tokens_ids), all_transaction_ids
+    )
+    num_transactions: int = len(all_transaction_ids)
+    frequent_tokens_ids: list[int] = get_frequent_tokens_ids(
+        supports, all_tokens_ids, min_support
+    )
+    ranks: dict[int, int] = {
+        token_id: rank for rank, token_id in enumerate(frequent_tokens_ids)
+    }
+
+    print("Partitioning equivalence classes...")
+    weights: dict[int, int] = get_projection_weights(
+        iterate_transactions(directory, all_tokens_ids), ranks
+    )
+    partitions: list[Partition] = create_partitions(
+        frequent_tokens_ids, weights, memory_budget
+    )
+    print(f"Created {len(partitions)} partitions")
+
+    with tempfile.TemporaryDirectory(dir=spill_directory) as temporary_directory:
+        spill_path: Path = Path(temporary_directory)
+
+        print("Spilling partitions to disk...")
+        spill_partitions(
+            iterate_transactions(directory, all_tokens_ids),
+            ranks,
+            partitions,
+            spill_path,
+        )
+
+        id_sets_lengths: list[int] = []
+        subtree_files: list[Path] = []
+        for partition in partitions:
+            print(
+                f"Building {algorithm} partition "
+                f"{partition.index + 1}/{len(partitions)}..."
+            )
+            projected_data: dict[int, list[int]] = {
+                transaction_id: tokens_ids
+                for transaction_id, tokens_ids in load_partition(spill_path, partition)
+            }
+            first_layer: list[TreeNode] = mine_partition(
+                projected_data,
+                partition,
+                frequent_tokens_ids[partition.first_rank :],
+                supports,
+                all_transaction_ids,
+                min_support,
+                algorithm,
+                id_sets_lengths,
+            )
+            del projected_data
+
+            subtree_file: Path = spill_path / f"partition_{partition.index}.tree.jsonl"
+            with open(subtree_file, "w") as file:
+                for node in first_layer:
+                    if algorithm == "declat":
+                        node.id_set = all_transaction_ids - node.id_set
+                    node.decode(tokens_map)
+                    file.write(json.dumps(node, cls=TreeJSONEncoder) + "\n")
+            subtree_files.append(subtree_file)
+
+        print("Calculating statistics...")
+        statistics: IdSetsLengthStats = calculate_statistics(id_sets_lengths)
+
+        print(f"Saving {algorithm} tree...")
+        if algorithm == "declat":
+            root: TreeNode = TreeNode([], num_transactions, set())
+        else:
+            root = TreeNode([], num_transactions, all_transaction_ids)
+        save_tree_out_of_core(
+            root, subtree_files, directory, min_support, algorithm, statistics
+        )
+
+    return statistics
+
+
+@click.command()
+@click.option(
+    "-d",
+    "--directory",
+    required=True,
+    type=click.Path(exists=True),
+    help="Directory to load the data from",
+)
+@click.option(
+    "-s",
+    "--support",
+    required=True,
+    type=click.IntRange(min=1),
+    help="Minimum support for frequent itemsets",
+)
+@click.option(
+    "-a",
+    "--algorithm",
+    default="declat",
+    show_default=True,
+    type=click.Choice(["declat", "eclat"]),
+    help="Algorithm to run",
+)
+@click.option(
+    "-m",
+    "--memory_budget",
+    default=256,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Memory budget for the id-sets of a single partition in MB",
+)
+@click.option(
+    "--spill_directory",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory for temporary partition files  [default: system temp]",
+)
+def out_of_core_cli(
+    directory: str,
+    support: int,
+    algorithm: Algorithm,
+    memory_budget: int,
+    spill_directory: Union[str, None],
+) -> None:
+    build_tree_out_of_core(
+        directory, support, algorithm, memory_budget * 1024 * 1024, spill_directory
+    )
+
+    print(f"All good! {algorithm} tree saved to {directory}/{algorithm}.json")
+
+
+if __name__ == "__main__":
+    out_of_core_cli()
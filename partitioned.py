@@ -0,0 +1,301 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import click
+
+from mining import (
+    Algorithm,
+    IdSetsLengthStats,
+    TreeNode,
+    calculate_statistics,
+    collect_id_sets_lengths,
+    get_id_sets_map,
+    get_tid_sets_map,
+    grow_tree,
+    load_transactions,
+    save_tree,
+)
+
+Itemset = tuple[int, ...]
+
+
+def split_into_shards(
+    data: dict[int, list[int]], num_shards: int
+) -> list[dict[int, list[int]]]:
+    transaction_ids: list[int] = list(data.keys())
+    shard_size: int = -(-len(transaction_ids) // num_shards)
+
+    return [
+        {
+            transaction_id: data[transaction_id]
+            for transaction_id in transaction_ids[start : start + shard_size]
+        }
+        for start in range(0, len(transaction_ids), max(shard_size, 1))
+    ]
+
+
+def get_local_min_support(
+    min_support: int, shard_size: int, num_transactions: int
+) -> int:
+    # An itemset with support > min_support overall has support
+    # > min_support * shard_size / num_transactions in at least one shard.
+    # Rounding down only adds candidates, so no frequent itemset is lost.
+    return min_support * shard_size // num_transactions
+
+
+def get_num_shards(num_transactions: int, min_support: int, num_shards: int) -> int:
+    # With a local threshold of 0 every subset of a shard's transactions is
+    # a candidate, so shards are merged until the smallest one, the last,
+    # keeps a threshold of at least 1
+    while num_shards > 1:
+        shard_size: int = -(-num_transactions // num_shards)
+        last_shard_size: int = num_transactions - shard_size * (
+            -(-num_transactions // shard_size) - 1
+        )
+        if get_local_min_support(min_support, last_shard_size, num_transactions) >= 1:
+            break
+        num_shards -= 1
+
+    return num_shards
+
+
+def collect_itemsets(tree: TreeNode, itemsets: list[Itemset]) -> None:
+    for child in tree.children:
+        itemsets.append(tuple(child.tokens_ids))
+        collect_itemsets(child, itemsets)
+
+
+def mine_shard(
+    shard: dict[int, list[int]],
+    all_tokens_ids: set[int],
+    local_min_support: int,
+    algorithm: Algorithm,
+) -> list[Itemset]:
+    id_sets_map: dict[int, set[int]] = get_id_sets_map(shard, all_tokens_ids, algorithm)
+    tree: TreeNode = grow_tree(
+        id_sets_map, set(shard.keys()), local_min_support, algorithm, []
+    )
+
+    itemsets: list[Itemset] = []
+    collect_itemsets(tree, itemsets)
+
+    return itemsets
+
+
+def get_candidates_tid_sets(
+    shard: dict[int, list[int]], all_tokens_ids: set[int], candidates: list[Itemset]
+) -> dict[Itemset, set[int]]:
+    # Candidates are sorted by length and every prefix of a candidate is
+    # a candidate as well, so each tid-set is one intersection away.
+    tid_sets_map: dict[int, set[int]] = get_tid_sets_map(shard, all_tokens_ids)
+    tid_sets: dict[Itemset, set[int]] = {(): set(shard.keys())}
+    for candidate in candidates:
+        tid_sets[candidate] = tid_sets[candidate[:-1]] & tid_sets_map[candidate[-1]]
+
+    del tid_sets[()]
+    return tid_sets
+
+
+def count_candidates(
+    shard: dict[int, list[int]], all_tokens_ids: set[int], candidates: list[Itemset]
+) -> dict[Itemset, int]:
+    return {
+        candidate: len(tid_set)
+        for candidate, tid_set in get_candidates_tid_sets(
+            shard, all_tokens_ids, candidates
+        ).items()
+    }
+
+
+def collect_tid_sets(
+    shard: dict[int, list[int]], all_tokens_ids: set[int], itemsets: list[Itemset]
+) -> dict[Itemset, set[int]]:
+    # Only globally frequent itemsets are requested, and empty tid-sets are
+    # not sent back. Their intersections repeat those of count_candidates:
+    # keeping them would mean sending every candidate's tid-set back or
+    # keeping state in worker processes that may get another shard next.
+    return {
+        itemset: tid_set
+        for itemset, tid_set in get_candidates_tid_sets(
+            shard, all_tokens_ids, itemsets
+        ).items()
+        if len(tid_set) > 0
+    }
+
+
+def build_tree_from_tid_sets(
+    tid_sets: dict[Itemset, set[int]],
+    all_transaction_ids: set[int],
+    min_support: int,
+    algorithm: Algorithm,
+) -> TreeNode:
+    if algorithm == "declat":
+        tree: TreeNode = TreeNode([], len(all_transaction_ids), set())
+    else:
+        tree = TreeNode([], len(all_transaction_ids), all_transaction_ids)
+
+    nodes: dict[Itemset, TreeNode] = {(): tree}
+    parents_tid_sets: dict[Itemset, set[int]] = {(): all_transaction_ids}
+    for itemset, tid_set in tid_sets.items():
+        if len(tid_set) <= min_support:
+            continue
+
+        id_set: set[int] = tid_set
+        if algorithm == "declat":
+            id_set = parents_tid_sets[itemset[:-1]] - tid_set
+
+        node: TreeNode = TreeNode(list(itemset), len(tid_set), id_set)
+        nodes[itemset[:-1]].add_child(node)
+        nodes[itemset] = node
+        parents_tid_sets[itemset] = tid_set
+
+    return tree
+
+
+def build_tree_partitioned(
+    data: dict[int, list[int]],
+    tokens_map: dict[int, str],
+    min_support: int,
+    algorithm: Algorithm,
+    num_shards: int,
+    executor: Executor,
+) -> tuple[TreeNode, IdSetsLengthStats]:
+    if algorithm not in ("eclat", "declat"):
+        raise ValueError(f"Unknown algorithm {algorithm}")
+
+    all_tokens_ids: set[int] = set(tokens_map.keys())
+    max_num_shards: int = get_num_shards(len(data), min_support, num_shards)
+    if max_num_shards < num_shards:
+        print(
+            f"Reduced the number of shards from {num_shards} to {max_num_shards}, "
+            "so every local support is at least 1"
+        )
+    shards: list[dict[int, list[int]]] = split_into_shards(data, max_num_shards)
+    local_min_supports: list[int] = [
+        get_local_min_support(min_support, len(shard), len(data)) for shard in shards
+    ]
+
+    print(f"Mining {len(shards)} shards locally...")
+    print(f"Local supports: {', '.join(map(str, local_min_supports))}")
+    local_itemsets_futures = [
+        executor.submit(mine_shard, shard, all_tokens_ids, local_min_support, algorithm)
+        for shard, local_min_support in zip(shards, local_min_supports)
+    ]
+    candidates_set: set[Itemset] = set()
+    for itemsets_future in local_itemsets_futures:
+        candidates_set.update(itemsets_future.result())
+
+    # Order of the single process tree: tokens ranked as in the first level,
+    # parents before children and siblings by their last token.
+    ranks: dict[int, int] = {
+        token_id: rank for rank, token_id in enumerate(all_tokens_ids)
+    }
+    candidates: list[Itemset] = sorted(
+        (tuple(sorted(itemset, key=ranks.__getitem__)) for itemset in candidates_set),
+        key=lambda itemset: (len(itemset), [ranks[token_id] for token_id in itemset]),
+    )
+    print(f"Counting {len(candidates)} candidates globally...")
+    counts_futures = [
+        executor.submit(count_candidates, shard, all_tokens_ids, candidates)
+        for shard in shards
+    ]
+    supports: dict[Itemset, int] = {candidate: 0 for candidate in candidates}
+    for counts_future in counts_futures:
+        for candidate, count in counts_future.result().items():
+            supports[candidate] += count
+
+    # Candidates are prefix closed and so are the frequent ones among them
+    frequent_itemsets: list[Itemset] = [
+        candidate for candidate in candidates if supports[candidate] > min_support
+    ]
+    print(f"Collecting tid-sets of {len(frequent_itemsets)} frequent itemsets...")
+    tid_sets_futures = [
+        executor.submit(collect_tid_sets, shard, all_tokens_ids, frequent_itemsets)
+        for shard in shards
+    ]
+    tid_sets: dict[Itemset, set[int]] = {
+        itemset: set() for itemset in frequent_itemsets
+    }
+    for tid_sets_future in tid_sets_futures:
+        for itemset, tid_set in tid_sets_future.result().items():
+            tid_sets[itemset] |= tid_set
+
+    print(f"Building {algorithm} tree...")
+    tree: TreeNode = build_tree_from_tid_sets(
+        tid_sets, set(data.keys()), min_support, algorithm
+    )
+
+    print("Decoding tokens...")
+    tree.decode(tokens_map)
+
+    print("Calculating statistics...")
+    id_sets_lengths: list[int] = []
+    collect_id_sets_lengths(tree, id_sets_lengths)
+    statistics: IdSetsLengthStats = calculate_statistics(id_sets_lengths)
+
+    return tree, statistics
+
+
+def create_executor(workers: int) -> Executor:
+    if workers == 1:
+        return ThreadPoolExecutor(max_workers=1)
+
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+@click.command()
+@click.option(
+    "-d",
+    "--directory",
+    required=True,
+    type=click.Path(exists=True),
+    help="Directory to load the data from",
+)
+@click.option(
+    "-s",
+    "--support",
+    required=True,
+    type=click.IntRange(min=1),
+    help="Minimum support for frequent itemsets",
+)
+@click.option(
+    "-a",
+    "--algorithm",
+    default="declat",
+    show_default=True,
+    type=click.Choice(["declat", "eclat"]),
+    help="Algorithm to run on each shard",
+)
+@click.option(
+    "-n",
+    "--num_shards",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of transaction shards",
+)
+@click.option(
+    "-j",
+    "--workers",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of local worker processes",
+)
+def partitioned_cli(
+    directory: str, support: int, algorithm: Algorithm, num_shards: int, workers: int
+) -> None:
+    data, tokens_map = load_transactions(directory)
+
+    with create_executor(workers) as executor:
+        tree, statistics = build_tree_partitioned(
+            data, tokens_map, support, algorithm, num_shards, executor
+        )
+
+    print(f"Saving {algorithm} tree...")
+    save_tree(tree, directory, support, algorithm, statistics)
+
+    print(f"All good! {algorithm} tree saved to {directory}/{algorithm}.json")
+
+
+if __name__ == "__main__":
+    partitioned_cli()
@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+import pytest
+
+DATA: dict[int, list[int]] = {
+    0: [0, 1, 2],
+    1: [0, 1, 2],
+    2: [0, 1, 2],
+    3: [0, 1],
+    4: [1, 2, 3],
+    5: [2, 3, 4],
+    6: [0, 2, 4],
+}
+TOKENS: list[str] = ["hello", "world", "hey", "welcome", "there"]
+
+
+@pytest.fixture
+def dataset_directory(tmp_path: Path) -> Path:
+    with open(tmp_path / "data.json", "w") as file:
+        json.dump({"tokens": {str(k): v for k, v in DATA.items()}}, file)
+    with open(tmp_path / "tokens_map.json", "w") as file:
+        json.dump({"token": {str(k): v for k, v in enumerate(TOKENS)}}, file)
+
+    return tmp_path
+
+
+def normalize(node: dict) -> dict:
+    return {
+        "tokens_ids": node["tokens_ids"],
+        "tokens": node["tokens"],
+        "support": node["support"],
+        "id_set": sorted(node["id_set"]),
+        "children": [normalize(child) for child in node["children"]],
+    }
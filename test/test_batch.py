@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+
+import pytest
+from conftest import normalize
+
+from batch import BatchEntry, load_manifest, prune_tree, run_batch
+from build_tree import TreeJSONEncoder, build_tree
+
+
+# load_manifest
+def test_load_manifest_invalid(tmp_path: Path, dataset_directory: Path) -> None:
+    with pytest.raises(FileNotFoundError) as not_found:
+        load_manifest(str(tmp_path / "missing.json"))
+
+    assert (
+        str(not_found.value) == f"No manifest file found at {tmp_path / 'missing.json'}"
+    )
+
+    manifest_path: Path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps([{"supports": [1]}]))
+
+    with pytest.raises(ValueError) as e:
+        load_manifest(str(manifest_path))
+
+    assert str(e.value) == "No directory found in manifest entry"
+
+    manifest_path.write_text(
+        json.dumps(
+            [
+                {
+                    "directory": str(dataset_directory),
+                    "supports": [1],
+                    "algorithms": ["x"],
+                }
+            ]
+        )
+    )
+
+    with pytest.raises(ValueError) as e:
+        load_manifest(str(manifest_path))
+
+    assert str(e.value) == "Unknown algorithm x"
+
+    for algorithms in ["eclat", [], [1]]:
+        manifest_path.write_text(
+            json.dumps(
+                [
+                    {
+                        "directory": str(dataset_directory),
+                        "supports": [1],
+                        "algorithms": algorithms,
+                    }
+                ]
+            )
+        )
+
+        with pytest.raises(ValueError) as e:
+            load_manifest(str(manifest_path))
+
+        assert (
+            str(e.value)
+            == f"Algorithms for {dataset_directory} are not a list of names"
+        )
+
+    manifest_path.write_text(
+        json.dumps(
+            [
+                {"directory": str(dataset_directory), "supports": [1]},
+                {"directory": f"{dataset_directory}/.", "supports": [2]},
+            ]
+        )
+    )
+
+    with pytest.raises(ValueError) as e:
+        load_manifest(str(manifest_path))
+
+    assert (
+        str(e.value)
+        == f"Directory {dataset_directory}/. is listed in more than one entry"
+    )
+
+
+def test_load_manifest(tmp_path: Path, dataset_directory: Path) -> None:
+    manifest_path: Path = tmp_path / "manifest.json"
+    manifest_path.write_text(
+        json.dumps([{"directory": str(dataset_directory), "supports": [3, 1, 3]}])
+    )
+
+    entries: list[BatchEntry] = load_manifest(str(manifest_path))
+
+    assert len(entries) == 1
+    assert entries[0].directory == str(dataset_directory)
+    assert entries[0].supports == [1, 3]
+    assert entries[0].algorithms == ["declat"]
+
+
+# prune_tree
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+def test_prune_tree(dataset_directory: Path, algorithm: str) -> None:
+    tree, _ = build_tree(str(dataset_directory), 1, algorithm)  # type: ignore[arg-type]
+
+    for min_support in [2, 3, 4, 5, 6]:
+        expected, _ = build_tree(
+            str(dataset_directory), min_support, algorithm  # type: ignore[arg-type]
+        )
+        pruned = prune_tree(tree, min_support)
+
+        assert json.dumps(pruned, cls=TreeJSONEncoder) == json.dumps(
+            expected, cls=TreeJSONEncoder
+        )
+
+
+# run_batch
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_batch(dataset_directory: Path, jobs: int) -> None:
+    entries: list[BatchEntry] = [
+        BatchEntry(str(dataset_directory), [1, 3], ["eclat", "declat"])
+    ]
+
+    summary_df = run_batch(entries, jobs)
+
+    assert list(summary_df["algorithm"]) == ["eclat", "eclat", "declat", "declat"]
+    assert list(summary_df["min_support"]) == [1, 3, 1, 3]
+
+    for algorithm in ["eclat", "declat"]:
+        for min_support in [1, 3]:
+            expected, statistics = build_tree(
+                str(dataset_directory), min_support, algorithm  # type: ignore[arg-type]
+            )
+            with open(
+                dataset_directory / f"support_{min_support}" / f"{algorithm}.json"
+            ) as file:
+                result: dict = json.load(file)
+
+            assert result["min_support"] == min_support
+            assert result["id_sets_length_stats"] == statistics.__dict__
+            assert normalize(result["tree"]) == normalize(
+                json.loads(json.dumps(expected, cls=TreeJSONEncoder))
+            )
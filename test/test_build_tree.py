@@ -1,18 +1,35 @@
+import json
+from pathlib import Path
+
 import pandas as pd
 import pytest
+from conftest import DATA, TOKENS
 
 from build_tree import (
+    TreeJSONEncoder,
     TreeNode,
     build_declat_root,
     build_declat_tree,
     build_eclat_root,
     build_eclat_tree,
+    build_tree,
+    build_tree_with_algorithm,
     get_dif_sets_map,
     get_tid_sets_map,
     load_data,
     validate_data,
     validate_tokens_map,
 )
+from mining import (
+    Constraints,
+    DatasetProfile,
+    deduplicate_transactions,
+    expand_id_sets,
+    grow_tree,
+    mine_tree,
+    profile_dataset,
+    select_algorithm,
+)
 
 
 # load_data
@@ -231,6 +248,37 @@ def test_build_declat_tree() -> None:
     assert root.children[1].children[0].children == []
 
 
+def collect_nodes(node: TreeNode) -> list[TreeNode]:
+    return [
+        descendant
+        for child in node.children
+        for descendant in [child] + collect_nodes(child)
+    ]
+
+
+# id_sets_lengths collected by the builders
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+def test_build_tree_id_sets_lengths(algorithm: str) -> None:
+    all_tokens_ids: set[int] = {0, 1, 2, 3, 4}
+    id_sets_lengths: list[int] = []
+
+    if algorithm == "declat":
+        root: TreeNode = build_declat_root(
+            get_dif_sets_map(DATA, all_tokens_ids), len(DATA), 0, id_sets_lengths
+        )
+        build_declat_tree(root.children, 0, id_sets_lengths)
+    else:
+        root = build_eclat_root(
+            get_tid_sets_map(DATA, all_tokens_ids), 0, set(DATA), id_sets_lengths
+        )
+        build_eclat_tree(root.children, 0, id_sets_lengths)
+
+    # Nodes of every level are counted, not only the first two
+    nodes: list[TreeNode] = collect_nodes(root)
+    assert max(len(node.tokens_ids) for node in nodes) == 3
+    assert sorted(id_sets_lengths) == sorted(len(node.id_set) for node in nodes)
+
+
 # get_tid_sets_map
 def test_get_tid_sets_map() -> None:
     data: dict[int, list[int]] = {
@@ -336,3 +384,294 @@ def test_build_eclat_tree() -> None:
     assert root.children[1].children[0].support == 4
     assert root.children[1].children[0].id_set == {0, 1, 2, 4}
     assert root.children[1].children[0].children == []
+
+
+# Constraints
+def test_Constraints_from_tokens() -> None:
+    tokens_map: dict[int, str] = {0: "hello", 1: "world", 2: "hey", 3: "welcome"}
+
+    constraints: Constraints = Constraints.from_tokens(
+        tokens_map, 2, ["hey", "hello", "hey"], ["world"], ["hello", "hey"]
+    )
+
+    assert constraints.max_length == 2
+    assert constraints.required_tokens_ids == [2, 0]
+    assert constraints.excluded_tokens_ids == {1}
+    assert constraints.allowed_tokens_ids == {0, 2}
+
+    with pytest.raises(ValueError) as e:
+        Constraints.from_tokens(tokens_map, required_tokens=["hi"])
+
+    assert str(e.value) == "Token hi not found in tokens_map.json"
+
+
+def test_Constraints() -> None:
+    constraints: Constraints = Constraints(3, [2, 0], {1}, {0, 2, 3})
+
+    assert constraints.order([0, 1, 2, 3, 4]) == [2, 0, 3]
+
+    assert constraints.is_viable([2])
+    assert constraints.is_viable([2, 0, 3])
+    assert not constraints.is_viable([0])
+    assert not constraints.is_viable([2, 3])
+
+    assert not constraints.is_satisfied([2])
+    assert constraints.is_satisfied([2, 0])
+
+    assert constraints.can_extend([2, 0])
+    assert not constraints.can_extend([2, 0, 3])
+    assert not constraints.can_extend([3])
+
+    assert not Constraints(1, [2, 0]).is_viable([2])
+
+
+# build_declat_tree with constraints
+def test_build_declat_tree_constraints() -> None:
+    empty_set: set[int] = set()
+    id_sets_map: dict[int, set[int]] = {0: {4}, 1: empty_set, 2: {3}, 3: {0, 1, 2, 3}}
+    constraints: Constraints = Constraints(max_length=2, required_tokens_ids=[2])
+    id_sets_lengths: list[int] = []
+
+    root: TreeNode = grow_tree(
+        id_sets_map, {0, 1, 2, 3, 4}, 2, "declat", id_sets_lengths, constraints
+    )
+
+    assert root.children == [TreeNode([2], 4, {3})]
+    assert root.children[0].children == [
+        TreeNode([2, 0], 3, {4}),
+        TreeNode([2, 1], 4, set()),
+    ]
+    assert root.children[0].children[0].children == []
+    assert sorted(id_sets_lengths) == [0, 1, 1]
+
+
+# build_eclat_tree with constraints
+def test_build_eclat_tree_constraints() -> None:
+    tid_sets_map: dict[int, set[int]] = {
+        0: {0, 1, 2, 3},
+        1: {0, 1, 2, 3, 4},
+        2: {0, 1, 2, 4},
+        3: {4},
+    }
+    all_transaction_ids: set[int] = {0, 1, 2, 3, 4}
+
+    root: TreeNode = grow_tree(
+        tid_sets_map, all_transaction_ids, 2, "eclat", [], Constraints(None, [], {1})
+    )
+
+    assert root.children == [
+        TreeNode([0], 4, {0, 1, 2, 3}),
+        TreeNode([2], 4, {0, 1, 2, 4}),
+    ]
+    assert root.children[0].children == [TreeNode([0, 2], 3, {0, 1, 2})]
+
+    root = grow_tree(
+        tid_sets_map, all_transaction_ids, 2, "eclat", [], Constraints(None, [0, 2])
+    )
+
+    assert root.children == [TreeNode([0], 4, {0, 1, 2, 3})]
+    assert root.children[0].children == [TreeNode([0, 2], 3, {0, 1, 2})]
+    assert root.children[0].children[0].children == [TreeNode([0, 2, 1], 3, {0, 1, 2})]
+
+    root = grow_tree(
+        tid_sets_map, all_transaction_ids, 2, "eclat", [], Constraints(None, [0, 3])
+    )
+
+    assert root.children == []
+
+
+# deduplicate_transactions
+def test_deduplicate_transactions() -> None:
+    data: dict[int, list[int]] = {
+        0: [0, 1, 2],
+        1: [2, 1, 0],
+        2: [0, 1, 2],
+        3: [0, 1],
+        4: [1, 2, 3],
+        5: [0, 1],
+    }
+
+    unique_data, weights, transactions_ids_map = deduplicate_transactions(data)
+
+    assert unique_data == {0: [0, 1, 2], 3: [0, 1], 4: [1, 2, 3]}
+    assert weights == {0: 3, 3: 2, 4: 1}
+    assert transactions_ids_map == {0: [0, 1, 2], 3: [3, 5], 4: [4]}
+
+
+# build_declat_tree with weights
+def test_build_declat_tree_weighted() -> None:
+    empty_set: set[int] = set()
+    id_sets_map: dict[int, set[int]] = {0: {4}, 1: empty_set, 2: {3}, 3: {0, 3}}
+    weights: dict[int, int] = {0: 3, 3: 1, 4: 1}
+
+    root: TreeNode = grow_tree(id_sets_map, {0, 3, 4}, 2, "declat", [], None, weights)
+
+    assert root.support == 5
+    assert root.children == [
+        TreeNode([0], 4, {4}),
+        TreeNode([1], 5, set()),
+        TreeNode([2], 4, {3}),
+    ]
+    assert root.children[0].children == [
+        TreeNode([0, 1], 4, set()),
+        TreeNode([0, 2], 3, {3}),
+    ]
+    assert root.children[1].children == [TreeNode([1, 2], 4, {3})]
+    assert root.children[0].children[0].children == [TreeNode([0, 1, 2], 3, {3})]
+
+
+# build_eclat_tree with weights
+def test_build_eclat_tree_weighted() -> None:
+    tid_sets_map: dict[int, set[int]] = {0: {0, 3}, 1: {0, 3, 4}, 2: {0, 4}, 3: {4}}
+    weights: dict[int, int] = {0: 3, 3: 1, 4: 1}
+
+    root: TreeNode = grow_tree(tid_sets_map, {0, 3, 4}, 2, "eclat", [], None, weights)
+
+    assert root.support == 5
+    assert root.children == [
+        TreeNode([0], 4, {0, 3}),
+        TreeNode([1], 5, {0, 3, 4}),
+        TreeNode([2], 4, {0, 4}),
+    ]
+    assert root.children[0].children == [
+        TreeNode([0, 1], 4, {0, 3}),
+        TreeNode([0, 2], 3, {0}),
+    ]
+    assert root.children[1].children == [TreeNode([1, 2], 4, {0, 4})]
+    assert root.children[0].children[0].children == [TreeNode([0, 1, 2], 3, {0})]
+
+
+# expand_id_sets
+def test_expand_id_sets() -> None:
+    root: TreeNode = TreeNode([], 5, {0, 3})
+    root.add_child(TreeNode([0], 4, {0}))
+
+    expand_id_sets(root, {0: [0, 1, 2], 3: [3, 5]})
+
+    assert root.id_set == {0, 1, 2, 3, 5}
+    assert root.children[0].id_set == {0, 1, 2}
+
+
+# mine_tree with deduplication
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+@pytest.mark.parametrize("min_support", [1, 2, 4])
+def test_mine_tree_deduplicate(algorithm: str, min_support: int) -> None:
+    tokens_map: dict[int, str] = dict(enumerate(TOKENS))
+    data: dict[int, list[int]] = {**DATA, 7: [1, 2, 3], 8: [0, 1, 2]}
+    expected, expected_statistics = mine_tree(
+        data, tokens_map, min_support, algorithm  # type: ignore[arg-type]
+    )
+
+    tree, statistics = mine_tree(
+        data, tokens_map, min_support, algorithm, deduplicate=True  # type: ignore[arg-type]
+    )
+
+    assert json.dumps(tree, cls=TreeJSONEncoder) == json.dumps(
+        expected, cls=TreeJSONEncoder
+    )
+    assert statistics.__dict__ == expected_statistics.__dict__
+
+
+def test_mine_tree_deduplicate_id_sets_map() -> None:
+    with pytest.raises(ValueError):
+        mine_tree(DATA, dict(enumerate(TOKENS)), 1, "eclat", {}, None, True)
+
+
+# mine_tree with fpgrowth
+@pytest.mark.parametrize("deduplicate", [False, True])
+@pytest.mark.parametrize("min_support", [1, 2, 4])
+def test_mine_tree_fpgrowth(min_support: int, deduplicate: bool) -> None:
+    tokens_map: dict[int, str] = dict(enumerate(TOKENS))
+    expected, expected_statistics = mine_tree(DATA, tokens_map, min_support, "eclat")
+
+    tree, statistics = mine_tree(
+        DATA, tokens_map, min_support, "fpgrowth", deduplicate=deduplicate
+    )
+
+    assert json.dumps(tree, cls=TreeJSONEncoder) == json.dumps(
+        expected, cls=TreeJSONEncoder
+    )
+    assert statistics.__dict__ == expected_statistics.__dict__
+
+
+@pytest.mark.parametrize("min_support", [0, 1, 2])
+@pytest.mark.parametrize(
+    "constraints",
+    [
+        Constraints(2, [2], {1}),
+        Constraints(None, [2, 0]),
+        Constraints(2, [2, 0]),
+        Constraints(1, [2, 0]),
+        Constraints(None, [4, 0]),
+        Constraints(None, [2], {0}, {0, 1, 2}),
+        Constraints(None, [1], {1}),
+    ],
+)
+def test_mine_tree_fpgrowth_constraints(
+    constraints: Constraints, min_support: int
+) -> None:
+    tokens_map: dict[int, str] = dict(enumerate(TOKENS))
+    expected, expected_statistics = mine_tree(
+        DATA, tokens_map, min_support, "eclat", None, constraints
+    )
+
+    tree, statistics = mine_tree(
+        DATA, tokens_map, min_support, "fpgrowth", None, constraints
+    )
+
+    assert json.dumps(tree, cls=TreeJSONEncoder) == json.dumps(
+        expected, cls=TreeJSONEncoder
+    )
+    assert statistics.__dict__ == expected_statistics.__dict__
+
+
+# profile_dataset
+def test_profile_dataset() -> None:
+    profile: DatasetProfile = profile_dataset(DATA, 3)
+
+    assert profile.num_transactions == 7
+    assert profile.num_tokens == 5
+    assert profile.density == 20 / 35
+    assert profile.median_length == 3
+    assert profile.p90_length == 3
+    assert profile.num_frequent_tokens == 3
+    assert profile.frequent_density == 16 / 21
+    assert profile.avg_frequent_length == 16 / 7
+
+
+# select_algorithm
+def test_select_algorithm() -> None:
+    assert select_algorithm(profile_dataset(DATA, 3))[0] == "declat"
+
+    sparse_rows: dict[int, list[int]] = {
+        transaction_id: [transaction_id, transaction_id + 1]
+        for transaction_id in range(10)
+    }
+    assert select_algorithm(profile_dataset(sparse_rows, 0))[0] == "eclat"
+
+    long_rows: dict[int, list[int]] = {
+        transaction_id: list(range(transaction_id % 4, 20))
+        for transaction_id in range(10)
+    }
+    assert select_algorithm(profile_dataset(long_rows, 6))[0] == "declat"
+
+    long_sparse_rows: dict[int, list[int]] = {
+        transaction_id: list(range(transaction_id * 10, transaction_id * 10 + 10))
+        + [1000 + transaction_id % 2]
+        for transaction_id in range(10)
+    }
+    assert select_algorithm(profile_dataset(long_sparse_rows, 0))[0] == "fpgrowth"
+
+
+# build_tree_with_algorithm
+def test_build_tree_with_algorithm(dataset_directory: Path) -> None:
+    tree, statistics, algorithm = build_tree_with_algorithm(
+        str(dataset_directory), 1, "auto"
+    )
+
+    assert algorithm == select_algorithm(profile_dataset(DATA, 1))[0]
+    expected, expected_statistics = build_tree(str(dataset_directory), 1, algorithm)
+    assert json.dumps(tree, cls=TreeJSONEncoder) == json.dumps(
+        expected, cls=TreeJSONEncoder
+    )
+    assert statistics.__dict__ == expected_statistics.__dict__
@@ -0,0 +1,85 @@
+from itertools import combinations
+
+import pytest
+from conftest import DATA
+
+from fpgrowth import FPTree, build_fp_tree, fpgrowth
+
+
+def count_itemsets(
+    data: dict[int, list[int]], min_support: int
+) -> dict[frozenset[int], int]:
+    tokens_ids: set[int] = {token_id for row in data.values() for token_id in row}
+    supports: dict[frozenset[int], int] = {}
+    for length in range(1, len(tokens_ids) + 1):
+        for itemset in combinations(sorted(tokens_ids), length):
+            support: int = sum(set(itemset) <= set(row) for row in data.values())
+            if support > min_support:
+                supports[frozenset(itemset)] = support
+
+    return supports
+
+
+# FPTree
+def test_FPTree() -> None:
+    fp_tree: FPTree = FPTree()
+
+    fp_tree.add([2, 0, 1], 2)
+    fp_tree.add([2, 0], 1)
+    fp_tree.add([2, 3], 1)
+
+    assert list(fp_tree.root.children.keys()) == [2]
+    assert fp_tree.root.children[2].count == 4
+    assert [node.count for node in fp_tree.header[0]] == [3]
+    assert [node.count for node in fp_tree.header[1]] == [2]
+    assert sorted(fp_tree.get_prefix_paths(1)) == [([0, 2], 2)]
+    assert sorted(fp_tree.get_prefix_paths(0)) == [([2], 3)]
+    assert fp_tree.get_prefix_paths(2) == []
+
+
+# build_fp_tree
+def test_build_fp_tree() -> None:
+    fp_tree, supports = build_fp_tree(
+        [([0, 1, 2], 1), ([1, 2], 1), ([2, 3], 2)], min_support=1
+    )
+
+    assert supports == {1: 2, 2: 4, 3: 2}
+    assert list(fp_tree.root.children.keys()) == [2]
+    assert sorted(fp_tree.root.children[2].children.keys()) == [1, 3]
+    assert 0 not in fp_tree.header
+
+
+# fpgrowth
+@pytest.mark.parametrize("min_support", [0, 1, 2, 4, 7])
+def test_fpgrowth(min_support: int) -> None:
+    itemsets = fpgrowth(DATA, min_support)
+
+    assert {
+        frozenset(itemset): support for itemset, support in itemsets.items()
+    } == count_itemsets(DATA, min_support)
+
+
+def test_fpgrowth_max_length() -> None:
+    itemsets = fpgrowth(DATA, 1, max_length=2)
+
+    assert {frozenset(itemset): support for itemset, support in itemsets.items()} == {
+        itemset: support
+        for itemset, support in count_itemsets(DATA, 1).items()
+        if len(itemset) <= 2
+    }
+
+
+def test_fpgrowth_weights() -> None:
+    data: dict[int, list[int]] = {0: [0, 1, 2], 3: [0, 1], 4: [1, 2, 3]}
+
+    itemsets = fpgrowth(data, 2, weights={0: 3, 3: 1, 4: 1})
+
+    assert {frozenset(itemset): support for itemset, support in itemsets.items()} == {
+        frozenset([0]): 4,
+        frozenset([1]): 5,
+        frozenset([2]): 4,
+        frozenset([0, 1]): 4,
+        frozenset([0, 2]): 3,
+        frozenset([1, 2]): 4,
+        frozenset([0, 1, 2]): 3,
+    }
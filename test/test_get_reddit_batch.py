@@ -0,0 +1,226 @@
+import json
+import threading
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+import pytest
+
+import get_reddit_batch
+from get_reddit import create_token_ids
+from get_reddit_batch import (
+    Backend,
+    FakeBackend,
+    FetchError,
+    Post,
+    PrawBackend,
+    RateLimiter,
+    ScrapeJob,
+    fetch_page_with_retries,
+    scrape_batch,
+    stream_posts,
+)
+
+TITLES: dict[str, list[str]] = {
+    "funny": [f"funny title {i} number {i % 7}" for i in range(250)],
+    "AMA": [f"ama title {i % 11} I am {i}" for i in range(120)],
+}
+
+
+def tokenize(title: str) -> list[str]:
+    return list(dict.fromkeys(title.lower().split()))
+
+
+def create_rate_limiter() -> RateLimiter:
+    return RateLimiter(60000, clock=lambda: 0, sleep=lambda _: None)
+
+
+# RateLimiter
+def test_RateLimiter() -> None:
+    now: list[float] = [0]
+    sleeps: list[float] = []
+    rate_limiter = RateLimiter(60, clock=lambda: now[0], sleep=sleeps.append)
+
+    rate_limiter.acquire()
+    rate_limiter.acquire()
+    rate_limiter.acquire()
+    now[0] = 10
+    rate_limiter.acquire()
+    now[0] = 10.5
+    rate_limiter.acquire()
+
+    assert sleeps == [1, 2, 0.5]
+
+
+# fetch_page_with_retries
+def test_fetch_page_with_retries() -> None:
+    job = ScrapeJob("funny", "top", "all", 10)
+    sleeps: list[float] = []
+
+    posts, after = fetch_page_with_retries(
+        FakeBackend(TITLES, failures=2),
+        create_rate_limiter(),
+        job,
+        None,
+        10,
+        retries=3,
+        backoff=0.5,
+        sleep=sleeps.append,
+    )
+
+    assert [post.title for post in posts] == TITLES["funny"][:10]
+    assert after == "10"
+    assert sleeps == [0.5, 1.0]
+
+    with pytest.raises(FetchError):
+        fetch_page_with_retries(
+            FakeBackend(TITLES, failures=2),
+            create_rate_limiter(),
+            job,
+            None,
+            10,
+            retries=1,
+            backoff=0,
+            sleep=sleeps.append,
+        )
+
+
+# stream_posts
+def test_stream_posts() -> None:
+    jobs: list[ScrapeJob] = [
+        ScrapeJob(subreddit, listing, "all", 230)  # type: ignore[arg-type]
+        for subreddit in ["funny", "AMA"]
+        for listing in ["top", "hot"]
+    ]
+    backend = FakeBackend(TITLES, failures=3)
+
+    posts: dict[ScrapeJob, list[str]] = {job: [] for job in jobs}
+    for job, post in stream_posts(jobs, backend, create_rate_limiter(), 3, 3, 0):
+        posts[job].append(post.title)
+
+    expected: dict[str, list[str]] = {
+        "funny": TITLES["funny"][:230],
+        "ama": TITLES["AMA"],
+    }
+    for job in jobs:
+        assert job.error is None
+        assert posts[job] == expected[job.subreddit]
+    assert backend.num_requests == 3 + 2 * 3 + 2 * 2
+
+
+def test_stream_posts_before_listing_ends() -> None:
+    first_post_received = threading.Event()
+
+    class BlockingBackend(FakeBackend):
+        def fetch_page(
+            self, job: ScrapeJob, after: Union[str, None], limit: int
+        ) -> tuple[list[Post], Union[str, None]]:
+            # Second page is served only once the first one was consumed
+            if after is not None and not first_post_received.wait(timeout=5):
+                raise ValueError("First page was not streamed")
+
+            return super().fetch_page(job, after, limit)
+
+    job = ScrapeJob("funny", "top", "all", 200)
+    titles: list[str] = []
+    for _, post in stream_posts(
+        [job], BlockingBackend(TITLES), create_rate_limiter(), 1
+    ):
+        titles.append(post.title)
+        first_post_received.set()
+
+    assert job.error is None
+    assert titles == TITLES["funny"][:200]
+
+
+# scrape_batch
+def test_scrape_batch(tmp_path: Path) -> None:
+    jobs: list[ScrapeJob] = [
+        ScrapeJob("funny", "top", "all", 150),
+        ScrapeJob("AMA", "new", "all", 150),
+        ScrapeJob("missing", "top", "all", 10),
+    ]
+
+    output_dirs: list[str] = scrape_batch(
+        jobs,
+        FakeBackend(TITLES),
+        create_rate_limiter(),
+        2,
+        0,
+        0,
+        str(tmp_path),
+        tokenize,
+    )
+
+    assert len(output_dirs) == 2
+    assert Path(output_dirs[0]).name.startswith("funny_150_top_all_")
+    assert Path(output_dirs[1]).name.startswith("ama_120_new_")
+    assert isinstance(jobs[2].error, ValueError)
+
+    for output_dir, titles in zip(output_dirs, [TITLES["funny"][:150], TITLES["AMA"]]):
+        expected_tokens, expected_tokens_map = create_token_ids(
+            pd.Series([tokenize(title) for title in titles])
+        )
+        data_df: pd.DataFrame = pd.read_json(f"{output_dir}/data.json").sort_index()
+        tokens_map_df: pd.DataFrame = pd.read_json(
+            f"{output_dir}/tokens_map.json"
+        ).sort_index()
+
+        assert list(data_df["title"]) == titles
+        assert list(data_df["tokens"]) == list(expected_tokens)
+        assert {
+            token: token_id for token_id, token in tokens_map_df["token"].items()
+        } == expected_tokens_map
+
+        with open(f"{output_dir}/metadata.json") as file:
+            assert json.load(file)["num_posts"] == len(titles)
+
+
+# Backend
+def test_Backend_incomplete() -> None:
+    class IncompleteBackend(Backend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()  # type: ignore[abstract]
+
+
+# PrawBackend
+def test_PrawBackend_client_per_thread(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_reddit_batch, "create_reddit_client", object)
+    backend: PrawBackend = PrawBackend()
+    clients: list[object] = []
+
+    def get_clients() -> None:
+        clients.extend([backend.get_client(), backend.get_client()])
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=get_clients) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(clients) == 6
+    assert all(clients[i] is clients[i + 1] for i in range(0, 6, 2))
+    assert len({id(client) for client in clients + [backend.get_client()]}) == 4
+
+
+# FakeBackend
+def test_FakeBackend_from_file(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        FakeBackend.from_file(str(tmp_path / "posts.json"))
+
+    with open(tmp_path / "posts.json", "w") as file:
+        json.dump(["title"], file)
+    with pytest.raises(ValueError):
+        FakeBackend.from_file(str(tmp_path / "posts.json"))
+
+    with open(tmp_path / "posts.json", "w") as file:
+        json.dump(TITLES, file)
+    backend: FakeBackend = FakeBackend.from_file(str(tmp_path / "posts.json"))
+
+    posts, after = backend.fetch_page(ScrapeJob("ama", "hot", "all", 200), "100", 100)
+    assert [post.title for post in posts] == TITLES["AMA"][100:]
+    assert after is None
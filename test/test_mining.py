@@ -0,0 +1,302 @@
+import json
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+
+import pytest
+from conftest import DATA, TOKENS
+
+import mining
+from build_tree import load_data
+from fpgrowth import fpgrowth
+from mining import (
+    Constraints,
+    PairSupports,
+    TreeJSONEncoder,
+    build_pair_supports,
+    count_pairs,
+    count_pairs_numpy,
+    get_id_sets_map,
+    get_pair_offset,
+    grow_fpgrowth_tree,
+    grow_tree,
+    load_json_data,
+    load_transactions,
+    mine_tree,
+    read_columns,
+    stream_column,
+    validate_json_data,
+    validate_json_tokens_map,
+)
+
+
+# read_columns
+def test_read_columns(tmp_path: Path) -> None:
+    with open(tmp_path / "data.json", "w") as file:
+        json.dump({"tokens": {"10": [1], "2": [0, 1]}}, file)
+
+    assert read_columns(str(tmp_path / "data.json")) == {"tokens": {2: [0, 1], 10: [1]}}
+
+
+@pytest.mark.parametrize(
+    "columns, message",
+    [
+        ([[0, 1]], "data.json is not a column oriented JSON"),
+        ({"tokens": [[0, 1]]}, "data.json is not a column oriented JSON"),
+        ({"tokens": {"a": [0, 1]}}, "Ids in data.json are not integers"),
+        ({"tokens": {"1": [0], "01": [1]}}, "Duplicate ids found in data.json"),
+    ],
+)
+def test_read_columns_invalid(tmp_path: Path, columns: object, message: str) -> None:
+    with open(tmp_path / "data.json", "w") as file:
+        json.dump(columns, file)
+
+    with pytest.raises(ValueError) as e:
+        read_columns(str(tmp_path / "data.json"))
+
+    assert str(e.value) == message
+
+
+# stream_column
+@pytest.mark.parametrize("chunk_size", [1, 7, 2**20])
+def test_stream_column(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, chunk_size: int
+) -> None:
+    monkeypatch.setattr(mining, "JSON_STREAM_CHUNK_SIZE", chunk_size)
+    columns: dict = {
+        "title": {"0": "a, b: {c}", "12": '\\"d"'},
+        "empty": {},
+        "tokens": {"0": [0, 1], "12": [123456], "3": []},
+    }
+    with open(tmp_path / "data.json", "w") as file:
+        json.dump(columns, file, indent=2)
+
+    for column_name in columns:
+        assert list(stream_column(str(tmp_path / "data.json"), column_name)) == [
+            (int(row_id), value) for row_id, value in columns[column_name].items()
+        ]
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ('{"title": {"0": "a"}}', "No tokens column found in data.json"),
+        ('{"tokens": {"a": [0]}}', "Ids in data.json are not integers"),
+        ('{"tokens": [[0, 1]]}', "data.json is not a column oriented JSON"),
+        ('{"tokens": {"0": [0, 1]', "data.json is not a column oriented JSON"),
+        ('{"tokens": {"0": [0, 1}}', "data.json is not a column oriented JSON"),
+    ],
+)
+def test_stream_column_invalid(tmp_path: Path, content: str, message: str) -> None:
+    with open(tmp_path / "data.json", "w") as file:
+        file.write(content)
+
+    with pytest.raises(ValueError) as e:
+        list(stream_column(str(tmp_path / "data.json"), "tokens"))
+
+    assert str(e.value) == message
+
+
+# load_json_data
+def test_load_json_data_missing_files() -> None:
+    with pytest.raises(FileNotFoundError) as e:
+        load_json_data("test/test_build_tree_data/missing_data")
+
+    assert str(e.value) == "No data.json file found in the directory"
+
+    with pytest.raises(FileNotFoundError) as e:
+        load_json_data("test/test_build_tree_data/missing_tokens_map")
+
+    assert str(e.value) == "No tokens_map.json file found in the directory"
+
+
+def test_load_json_data() -> None:
+    data_columns, tokens_map_columns = load_json_data("test/test_build_tree_data/valid")
+    data_df, tokens_map_df = load_data("test/test_build_tree_data/valid")
+
+    assert data_columns["tokens"] == data_df["tokens"].to_dict()
+    assert tokens_map_columns["token"] == tokens_map_df["token"].to_dict()
+
+
+# validate_json_data
+def test_validate_json_data() -> None:
+    validate_json_data({"tokens": {0: [0, 1], 1: [2, 3]}}, {0, 1, 2, 3})
+
+    with pytest.raises(ValueError) as e:
+        validate_json_data({"not_tokens": {0: [0, 1]}}, {0, 1})
+    assert str(e.value) == "No tokens column found in data.json"
+
+    with pytest.raises(ValueError) as e:
+        validate_json_data({"tokens": {0: 0, 1: 1}}, {0, 1})
+    assert str(e.value) == "Values in tokens column are not lists"
+
+    with pytest.raises(ValueError) as e:
+        validate_json_data({"tokens": {0: [0, 1], 1: [2, 3]}}, {0, 1, 2})
+    assert str(e.value) == "Token 3 not found in tokens_map.json"
+
+
+# validate_json_tokens_map
+def test_validate_json_tokens_map() -> None:
+    validate_json_tokens_map({"token": {0: "hello", 1: "world"}})
+
+    with pytest.raises(ValueError) as e:
+        validate_json_tokens_map({"not_token": {0: "hello"}})
+    assert str(e.value) == "No token column found in tokens_map.json"
+
+    with pytest.raises(ValueError) as e:
+        validate_json_tokens_map({"token": {0: "hello", 1: 1}})
+    assert str(e.value) == "Values in token column are not strings"
+
+    with pytest.raises(ValueError) as e:
+        validate_json_tokens_map({"token": {0: "hello", 1: "hello"}})
+    assert str(e.value) == "Duplicate tokens found in tokens_map.json"
+
+
+# load_transactions
+def test_load_transactions() -> None:
+    data, tokens_map = load_transactions("test/test_build_tree_data/valid")
+
+    assert data == {0: [0, 1], 1: [2, 3]}
+    assert tokens_map == {0: "hello", 1: "world", 2: "hey", 3: "welcome"}
+
+
+# build_pair_supports
+@pytest.mark.parametrize("weights", [None, {k: k + 1 for k in DATA}])
+def test_build_pair_supports(weights: dict[int, int]) -> None:
+    pair_supports: PairSupports = build_pair_supports(DATA, 1, weights)
+
+    for token_id, other_token_id in combinations(range(len(TOKENS)), 2):
+        assert pair_supports.get(token_id, other_token_id) == sum(
+            1 if weights is None else weights[transaction_id]
+            for transaction_id, tokens_ids in DATA.items()
+            if token_id in tokens_ids and other_token_id in tokens_ids
+        )
+
+
+def test_build_pair_supports_infrequent_tokens() -> None:
+    pair_supports: PairSupports = build_pair_supports(DATA, 2)
+
+    assert pair_supports.indices == {0: 0, 1: 1, 2: 2}
+    assert list(pair_supports.supports) == [4, 4, 4]
+    assert pair_supports.get(2, 3) == 0
+
+
+# get_pair_offset
+def test_get_pair_offset() -> None:
+    assert [
+        get_pair_offset(index, other_index, 4)
+        for index, other_index in combinations(range(4), 2)
+    ] == list(range(6))
+
+
+# count_pairs
+def test_count_pairs() -> None:
+    rows: list[tuple[list[int], int]] = [([0, 2], 1), ([2, 1], 3), ([], 2)]
+
+    assert count_pairs(rows, 3) == Counter({1: 1, 2: 3})
+    assert list(count_pairs_numpy(rows, 3)) == [0, 1, 3]
+
+
+@pytest.mark.parametrize("block_pairs", [1, 9, 2**20])
+def test_count_pairs_numpy_blocks(
+    monkeypatch: pytest.MonkeyPatch, block_pairs: int
+) -> None:
+    monkeypatch.setattr(mining, "PAIR_SUPPORTS_BLOCK_PAIRS", block_pairs)
+    rows: list[tuple[list[int], int]] = [
+        (tokens_ids, transaction_id + 1) for transaction_id, tokens_ids in DATA.items()
+    ]
+    supports: Counter[int] = count_pairs(rows, len(TOKENS))
+
+    assert list(count_pairs_numpy(rows, len(TOKENS))) == [
+        supports[offset] for offset in range(len(TOKENS) * (len(TOKENS) - 1) // 2)
+    ]
+
+    # Over the dense size limit only the occurring pairs are kept
+    monkeypatch.setattr(mining, "PAIR_SUPPORTS_MAX_DENSE_BYTES", 0)
+    assert count_pairs_numpy(rows, len(TOKENS)) == supports
+
+
+# PairSupports
+def test_PairSupports_can_join() -> None:
+    pair_supports: PairSupports = PairSupports({0: 0, 1: 1}, Counter({0: 1}))
+
+    assert pair_supports.can_join(0, 1, 0)
+    assert not pair_supports.can_join(0, 1, 1)
+    assert not pair_supports.can_join(0, 2, 0)
+    assert pair_supports.num_skipped_joins == 2
+
+
+# grow_tree with pair supports
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+def test_grow_tree_pair_supports(algorithm: str) -> None:
+    data: dict[int, list[int]] = {0: [0, 1], 1: [0, 1], 2: [0, 2], 3: [1, 2]}
+    pair_supports: PairSupports = build_pair_supports(data, 1)
+
+    tree = grow_tree(
+        get_id_sets_map(data, {0, 1, 2}, algorithm),  # type: ignore[arg-type]
+        set(data.keys()),
+        1,
+        algorithm,  # type: ignore[arg-type]
+        [],
+        pair_supports=pair_supports,
+    )
+
+    assert [child.tokens_ids for child in tree.children[0].children] == [[0, 1]]
+    assert tree.children[1].children == []
+    assert pair_supports.num_skipped_joins == 2
+
+
+# mine_tree with pair pruning
+@pytest.mark.parametrize("deduplicate", [False, True])
+@pytest.mark.parametrize("min_support", [0, 1, 2, 4])
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+def test_mine_tree_prune_pairs(
+    algorithm: str, min_support: int, deduplicate: bool
+) -> None:
+    tokens_map: dict[int, str] = dict(enumerate(TOKENS))
+    data: dict[int, list[int]] = {**DATA, 7: [1, 2, 3], 8: [0, 1, 2]}
+    expected, expected_statistics = mine_tree(
+        data, tokens_map, min_support, algorithm  # type: ignore[arg-type]
+    )
+
+    tree, statistics = mine_tree(
+        data,
+        tokens_map,
+        min_support,
+        algorithm,  # type: ignore[arg-type]
+        deduplicate=deduplicate,
+        prune_pairs=True,
+    )
+
+    assert json.dumps(tree, cls=TreeJSONEncoder) == json.dumps(
+        expected, cls=TreeJSONEncoder
+    )
+    assert statistics.__dict__ == expected_statistics.__dict__
+
+
+# grow_fpgrowth_tree
+def test_grow_fpgrowth_tree_required_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    mined: list[dict[int, list[int]]] = []
+
+    def record_fpgrowth(data: dict[int, list[int]], *args: object) -> dict:
+        mined.append(data)
+        return fpgrowth(data, *args)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(mining, "fpgrowth", record_fpgrowth)
+    grow_fpgrowth_tree(
+        DATA,
+        get_id_sets_map(DATA, set(range(len(TOKENS))), "fpgrowth"),
+        0,
+        [],
+        Constraints(None, [2, 0]),
+    )
+
+    assert mined == [
+        {
+            transaction_id: [
+                token_id for token_id in tokens_ids if token_id not in (0, 2)
+            ]
+            for transaction_id, tokens_ids in DATA.items()
+            if 0 in tokens_ids and 2 in tokens_ids
+        }
+    ]
@@ -0,0 +1,126 @@
+import json
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from conftest import DATA, normalize
+
+from build_tree import TreeJSONEncoder, build_tree
+from out_of_core import (
+    Partition,
+    build_tree_out_of_core,
+    count_supports,
+    create_partitions,
+    get_frequent_tokens_ids,
+    get_projection_weights,
+    iterate_transactions,
+    mine_partition,
+)
+
+
+# count_supports
+def test_count_supports() -> None:
+    all_transaction_ids: set[int] = set()
+    supports: Counter[int] = count_supports(DATA.items(), all_transaction_ids)
+
+    assert supports == {0: 5, 1: 5, 2: 6, 3: 2, 4: 2}
+    assert all_transaction_ids == set(DATA.keys())
+    assert get_frequent_tokens_ids(supports, {0, 1, 2, 3, 4}, 2) == [0, 1, 2]
+
+
+def test_count_supports_repeated_tokens() -> None:
+    assert count_supports([(0, [0, 0, 1]), (1, [0, 1]), (2, [1])], set()) == {
+        0: 2,
+        1: 3,
+    }
+
+
+def test_count_supports_duplicate_ids() -> None:
+    with pytest.raises(ValueError) as e:
+        count_supports([(0, [0]), (1, [1]), (0, [1])], set())
+
+    assert str(e.value) == "Duplicate ids found in data.json"
+
+
+# iterate_transactions
+def test_iterate_transactions(dataset_directory: Path) -> None:
+    assert dict(iterate_transactions(str(dataset_directory), {0, 1, 2, 3, 4})) == DATA
+
+    with pytest.raises(ValueError) as e:
+        list(iterate_transactions(str(dataset_directory), {0, 1, 2, 3}))
+    assert str(e.value) == "Token 4 not found in tokens_map.json"
+
+    with pytest.raises(FileNotFoundError) as missing:
+        list(iterate_transactions(str(dataset_directory / "missing"), {0}))
+    assert str(missing.value) == "No data.json file found in the directory"
+
+
+# create_partitions
+def test_create_partitions() -> None:
+    ranks: dict[int, int] = {0: 0, 1: 1, 2: 2}
+    weights: dict[int, int] = get_projection_weights(DATA.items(), ranks)
+
+    assert weights == {0: 13, 1: 9, 2: 6}
+
+    partitions = create_partitions([0, 1, 2], weights, 15 * 64)
+    assert [partition.tokens_ids for partition in partitions] == [[0], [1, 2]]
+    assert [partition.first_rank for partition in partitions] == [0, 1]
+
+    partitions = create_partitions([0, 1, 2], weights, 1)
+    assert [partition.tokens_ids for partition in partitions] == [[0], [1], [2]]
+
+
+# mine_partition
+def test_mine_partition_declat_keeps_tid_sets() -> None:
+    id_sets_lengths: list[int] = []
+
+    first_layer = mine_partition(
+        dict(DATA),
+        Partition(0, [0, 1, 2], 0),
+        [0, 1, 2],
+        count_supports(DATA.items(), set()),
+        set(DATA.keys()),
+        1,
+        "declat",
+        id_sets_lengths,
+    )
+
+    # Dif-sets of the first level are derived only when the subtrees are written
+    assert [node.id_set for node in first_layer] == [
+        {0, 1, 2, 3, 6},
+        {0, 1, 2, 3, 4},
+        {0, 1, 2, 4, 5, 6},
+    ]
+    assert id_sets_lengths[:1] == [2]
+
+
+# build_tree_out_of_core
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+@pytest.mark.parametrize("memory_budget", [1, 500, 1024 * 1024])
+def test_build_tree_out_of_core(
+    dataset_directory: Path, algorithm: str, memory_budget: int
+) -> None:
+    tree, statistics = build_tree(str(dataset_directory), 1, algorithm)  # type: ignore[arg-type]
+    expected: dict = normalize(json.loads(json.dumps(tree, cls=TreeJSONEncoder)))
+
+    result_statistics = build_tree_out_of_core(
+        str(dataset_directory), 1, algorithm, memory_budget  # type: ignore[arg-type]
+    )
+
+    with open(dataset_directory / f"{algorithm}.json") as file:
+        result: dict = json.load(file)
+
+    assert result["min_support"] == 1
+    assert result["id_sets_length_stats"] == statistics.__dict__
+    assert result_statistics.__dict__ == statistics.__dict__
+    assert normalize(result["tree"]) == expected
+
+
+def test_build_tree_out_of_core_empty(dataset_directory: Path) -> None:
+    build_tree_out_of_core(str(dataset_directory), 10, "eclat", 1)
+
+    with open(dataset_directory / "eclat.json") as file:
+        result: dict = json.load(file)
+
+    assert result["tree"]["support"] == 7
+    assert result["tree"]["children"] == []
@@ -0,0 +1,84 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import DATA, TOKENS
+
+from build_tree import TreeJSONEncoder
+from mining import mine_tree
+from partitioned import (
+    build_tree_partitioned,
+    collect_tid_sets,
+    count_candidates,
+    get_local_min_support,
+    get_num_shards,
+    split_into_shards,
+)
+
+
+# split_into_shards
+def test_split_into_shards() -> None:
+    shards = split_into_shards(DATA, 3)
+
+    assert [list(shard.keys()) for shard in shards] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert split_into_shards(DATA, 1) == [DATA]
+    assert len(split_into_shards(DATA, 10)) == 7
+
+
+# get_local_min_support
+def test_get_local_min_support() -> None:
+    assert get_local_min_support(4, 3, 7) == 1
+    assert get_local_min_support(4, 7, 7) == 4
+    assert get_local_min_support(1, 1, 7) == 0
+
+
+# get_num_shards
+def test_get_num_shards() -> None:
+    assert get_num_shards(7, 1, 7) == 1
+    assert get_num_shards(7, 4, 3) == 2
+    assert get_num_shards(7, 4, 2) == 2
+    assert get_num_shards(700, 5, 100) == 5
+    assert get_num_shards(7, 0, 3) == 1
+
+
+# count_candidates
+def test_count_candidates() -> None:
+    shard = {3: [0, 1], 4: [1, 2, 3], 5: [2, 3, 4]}
+
+    counts = count_candidates(
+        shard, {0, 1, 2, 3, 4}, [(0,), (1,), (4,), (0, 4), (1, 2)]
+    )
+
+    assert counts == {(0,): 1, (1,): 2, (4,): 1, (0, 4): 0, (1, 2): 1}
+
+
+# collect_tid_sets
+def test_collect_tid_sets() -> None:
+    shard = {3: [0, 1], 4: [1, 2, 3], 5: [2, 3, 4]}
+
+    tid_sets = collect_tid_sets(shard, {0, 1, 2, 3, 4}, [(0,), (1,), (0, 2), (1, 2)])
+
+    assert tid_sets == {(0,): {3}, (1,): {3, 4}, (1, 2): {4}}
+
+
+# build_tree_partitioned
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+@pytest.mark.parametrize("num_shards", [1, 2, 3, 7])
+@pytest.mark.parametrize("min_support", [1, 2, 4])
+def test_build_tree_partitioned(
+    algorithm: str, num_shards: int, min_support: int
+) -> None:
+    tokens_map: dict[int, str] = dict(enumerate(TOKENS))
+    expected, expected_statistics = mine_tree(
+        DATA, tokens_map, min_support, algorithm  # type: ignore[arg-type]
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        tree, statistics = build_tree_partitioned(
+            DATA, tokens_map, min_support, algorithm, num_shards, executor  # type: ignore[arg-type]
+        )
+
+    assert json.dumps(tree, cls=TreeJSONEncoder) == json.dumps(
+        expected, cls=TreeJSONEncoder
+    )
+    assert statistics.__dict__ == expected_statistics.__dict__
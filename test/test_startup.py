@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+HEAVY_MODULES: list[str] = ["pandas", "numpy", "nltk", "praw"]
+
+# Share of the pandas import time a CLI may take to show its help on top of
+# a bare interpreter start. Both are measured on the same machine, so a slow
+# or busy one raises the budget too.
+STARTUP_BUDGET = 0.5
+
+
+def run_python(*args: str) -> float:
+    # Best of a few runs, so a busy machine does not fail the budget
+    best: float = float("inf")
+    for _ in range(5):
+        start: float = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "mining",
+        "build_tree",
+        "tree_format",
+        "out_of_core",
+        "partitioned",
+        "batch",
+        "get_reddit",
+        "get_reddit_batch",
+    ],
+)
+def test_import_without_heavy_modules(module: str) -> None:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES} if m in sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.parametrize("script", ["build_tree.py", "tree_format.py"])
+def test_startup_time(script: str) -> None:
+    interpreter_time: float = run_python("-c", "pass")
+    pandas_time: float = run_python("-c", "import pandas") - interpreter_time
+
+    assert (
+        run_python(script, "--help") - interpreter_time < STARTUP_BUDGET * pandas_time
+    )
@@ -0,0 +1,197 @@
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Union
+
+import pytest
+from click.testing import CliRunner
+from conftest import DATA, TOKENS
+
+from build_tree import TreeJSONEncoder, TreeNode, build_tree_cli
+from mining import mine_tree
+from tree_format import (
+    NODE_COLUMNS,
+    BinaryTree,
+    convert_binary_tree,
+    delta_encode,
+    get_codec,
+    save_tree_binary,
+    save_tree_chunked,
+)
+
+
+def dump(tree: TreeNode) -> dict:
+    # id-sets are written sorted, so compare them regardless of set order
+    return json.loads(
+        json.dumps(tree, cls=TreeJSONEncoder),
+        object_hook=lambda node: {**node, "id_set": sorted(node["id_set"])},
+    )
+
+
+# delta_encode
+def test_delta_encode() -> None:
+    assert delta_encode({7, 2, 3, 10}) == [2, 1, 4, 3]
+    assert delta_encode(set()) == []
+
+
+# get_codec
+def test_get_codec_unknown() -> None:
+    with pytest.raises(ValueError) as e:
+        get_codec("rar")
+
+    assert str(e.value) == "Unknown compression rar"
+
+
+def test_build_tree_cli_missing_codec(
+    dataset_directory: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    result = CliRunner().invoke(
+        build_tree_cli,
+        ["-d", str(dataset_directory), "-s", "1", "-f", "binary", "-c", "zstd"],
+    )
+
+    assert result.exit_code == 2
+    assert "Compression zstd requires the zstandard package" in result.output
+    assert "Reading data..." not in result.output
+
+
+# NODE_COLUMNS
+def test_node_columns_fixed_width() -> None:
+    for typecode in NODE_COLUMNS.values():
+        assert array(typecode).itemsize == 4
+
+
+# save_tree_binary
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+@pytest.mark.parametrize("block_size", [1, 3, 1024])
+def test_save_tree_binary(
+    tmp_path: Path, algorithm: str, compression: str, block_size: int
+) -> None:
+    tree, statistics = mine_tree(
+        DATA, dict(enumerate(TOKENS)), 1, algorithm  # type: ignore[arg-type]
+    )
+
+    save_tree_binary(
+        tree, str(tmp_path), 1, algorithm, statistics, compression, block_size  # type: ignore[arg-type]
+    )
+    binary_tree: BinaryTree = BinaryTree(str(tmp_path / f"{algorithm}.bin"))
+
+    assert binary_tree.min_support == 1
+    assert binary_tree.algorithm == algorithm
+    assert binary_tree.id_sets_length_stats.__dict__ == statistics.__dict__
+    assert dump(binary_tree.read_subtree()) == dump(tree)
+
+
+def test_binary_tree_random_access(tmp_path: Path) -> None:
+    tree, statistics = mine_tree(DATA, dict(enumerate(TOKENS)), 1, "eclat")
+    save_tree_binary(tree, str(tmp_path), 1, "eclat", statistics, "zlib", 2)
+    binary_tree: BinaryTree = BinaryTree(str(tmp_path / "eclat.bin"))
+
+    first_level: list[int] = binary_tree.get_children()
+    assert len(first_level) == len(tree.children)
+
+    for index, child in zip(first_level, tree.children):
+        assert dump(binary_tree.read_subtree(index)) == dump(child)
+
+    assert dump(binary_tree.read_subtree(first_level[0] + 1)) == dump(
+        tree.children[0].children[0]
+    )
+
+
+# convert_binary_tree
+def test_convert_binary_tree(tmp_path: Path) -> None:
+    tree, statistics = mine_tree(DATA, dict(enumerate(TOKENS)), 2, "declat")
+    save_tree_binary(tree, str(tmp_path), 2, "declat", statistics)
+
+    output_path: str = convert_binary_tree(str(tmp_path / "declat.bin"))
+
+    assert output_path == f"{tmp_path}/declat.json"
+    with open(output_path) as file:
+        result: dict = json.load(file)
+
+    assert result["min_support"] == 2
+    assert result["id_sets_length_stats"] == statistics.__dict__
+    assert json.loads(
+        json.dumps(result["tree"]),
+        object_hook=lambda node: {**node, "id_set": sorted(node["id_set"])},
+    ) == dump(tree)
+
+
+def test_binary_tree_invalid_file(tmp_path: Path) -> None:
+    (tmp_path / "eclat.bin").write_bytes(b"not a tree")
+
+    with pytest.raises(ValueError) as e:
+        BinaryTree(str(tmp_path / "eclat.bin"))
+
+    assert str(e.value) == f"{tmp_path / 'eclat.bin'} is not a binary tree file"
+
+
+# save_tree_chunked
+def load_chunked(directory: Path, node: dict) -> dict:
+    if "children_chunk" in node:
+        node["children"] = []
+        chunk_name: Union[str, None] = node.pop("children_chunk")
+        while chunk_name is not None:
+            with open(directory / chunk_name) as file:
+                chunk: dict = json.load(file)
+            node["children"].extend(chunk["children"])
+            chunk_name = chunk.get("next_chunk")
+        assert len(node["children"]) == node.pop("num_children")
+
+    node["id_set"] = sorted(node["id_set"])
+    node["children"] = [load_chunked(directory, child) for child in node["children"]]
+    return node
+
+
+@pytest.mark.parametrize("algorithm", ["eclat", "declat"])
+@pytest.mark.parametrize("max_chunk_nodes", [1, 3, 1000])
+def test_save_tree_chunked(
+    tmp_path: Path, algorithm: str, max_chunk_nodes: int
+) -> None:
+    tree, statistics = mine_tree(
+        DATA, dict(enumerate(TOKENS)), 1, algorithm  # type: ignore[arg-type]
+    )
+    (tmp_path / f"{algorithm}.chunk.99.json").write_text("{}")
+
+    save_tree_chunked(
+        tree, str(tmp_path), 1, algorithm, statistics, max_chunk_nodes  # type: ignore[arg-type]
+    )
+
+    with open(tmp_path / f"{algorithm}.index.json") as file:
+        result: dict = json.load(file)
+
+    assert result["min_support"] == 1
+    assert result["id_sets_length_stats"] == statistics.__dict__
+    if max_chunk_nodes == 1000:
+        assert "children_chunk" not in result["tree"]
+    else:
+        assert result["tree"]["children_chunk"] == f"{algorithm}.chunk.0.json"
+        assert "children" not in result["tree"]
+
+    assert not (tmp_path / f"{algorithm}.chunk.99.json").exists()
+    assert load_chunked(tmp_path, result["tree"]) == dump(tree)
+
+
+def count_inline_nodes(node: dict) -> int:
+    return 1 + sum(count_inline_nodes(child) for child in node.get("children", []))
+
+
+@pytest.mark.parametrize("max_chunk_nodes", [1, 2, 3, 5, 8])
+def test_save_tree_chunked_chunk_size(tmp_path: Path, max_chunk_nodes: int) -> None:
+    tree, statistics = mine_tree(DATA, dict(enumerate(TOKENS)), 0, "eclat")
+
+    save_tree_chunked(tree, str(tmp_path), 0, "eclat", statistics, max_chunk_nodes)
+
+    with open(tmp_path / "eclat.index.json") as file:
+        assert count_inline_nodes(json.load(file)["tree"]) <= max_chunk_nodes
+    for chunk_path in tmp_path.glob("eclat.chunk.*.json"):
+        with open(chunk_path) as file:
+            chunk: dict = json.load(file)
+        assert 0 < sum(count_inline_nodes(child) for child in chunk["children"])
+        assert sum(count_inline_nodes(child) for child in chunk["children"]) <= (
+            max_chunk_nodes
+        )
@@ -17,6 +17,8 @@ const Application = () => {
 	const [metadataFile, setMetadataFile] = useState<File | null>(null);
 	const [declatTreeFile, setDeclatTreeFile] = useState<File | null>(null);
 	const [eclatTreeFile, setEclatTreeFile] = useState<File | null>(null);
+	const [declatChunkFiles, setDeclatChunkFiles] = useState<Map<string, File>>(new Map());
+	const [eclatChunkFiles, setEclatChunkFiles] = useState<Map<string, File>>(new Map());
 
 	const handleFilesChange = (files: File[]) => {
 		setFiles(files);
@@ -28,16 +30,23 @@ const Application = () => {
 		let eclatTreeFile: File | null = null;
 		let dataFile: File | null = null;
 		let tokensMapFile: File | null = null;
+		const declatChunkFiles = new Map<string, File>();
+		const eclatChunkFiles = new Map<string, File>();
 
-		files.some((file: File) => {
+		files.forEach((file: File) => {
 			switch (file.name) {
 				case 'metadata.json':
 					metadataFile = file;
 					break;
 				case 'declat.json':
+				case 'declat.index.json':
 					declatTreeFile = file;
 					break;
 				case 'eclat.json':
+				case 'eclat.index.json':
+				// FP-growth trees have the same layout and tid-sets as Eclat trees
+				case 'fpgrowth.json':
+				case 'fpgrowth.index.json':
 					eclatTreeFile = file;
 					break;
 				case 'data.json':
@@ -46,9 +55,11 @@ const Application = () => {
 				case 'tokens_map.json':
 					tokensMapFile = file;
 					break;
+				default:
+					// Subtrees of a chunked tree, read only when expanded
+					if (/^declat\.chunk\.\d+\.json$/.test(file.name)) declatChunkFiles.set(file.name, file);
+					if (/^(eclat|fpgrowth)\.chunk\.\d+\.json$/.test(file.name)) eclatChunkFiles.set(file.name, file);
 			}
-
-			return metadataFile && declatTreeFile && dataFile && tokensMapFile;
 		});
 
 		setDataFile(dataFile);
@@ -56,6 +67,8 @@ const Application = () => {
 		setMetadataFile(metadataFile);
 		setDeclatTreeFile(declatTreeFile);
 		setEclatTreeFile(eclatTreeFile);
+		setDeclatChunkFiles(declatChunkFiles);
+		setEclatChunkFiles(eclatChunkFiles);
 	}, [files]);
 
 	return (
@@ -79,10 +92,10 @@ const Application = () => {
 					<DataDisplay dataFile={dataFile} />
 				</Rozette>
 				<Rozette title="Declat tree">
-					<TreeDisplay treeFile={declatTreeFile} NodeClass={DeclatNode} />
+					<TreeDisplay treeFile={declatTreeFile} chunkFiles={declatChunkFiles} NodeClass={DeclatNode} />
 				</Rozette>
 				<Rozette title="Eclat tree">
-					<TreeDisplay treeFile={eclatTreeFile} NodeClass={EclatNode} />
+					<TreeDisplay treeFile={eclatTreeFile} chunkFiles={eclatChunkFiles} NodeClass={EclatNode} />
 				</Rozette>
 			</div>
 		</div>
@@ -1,15 +1,28 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import Tree from 'react-d3-tree';
-import { CustomNodeElementProps } from 'react-d3-tree/lib/types/common';
+import { CustomNodeElementProps, RawNodeDatum } from 'react-d3-tree/lib/types/common';
 
 import { TreeNode, TreeNodeConstructorType } from '../model/node/TreeNode';
 import { asyncReadFile } from '../utils/asyncReadFile';
 import { showFileError } from '../utils/showError';
 import FileNotSelected from './common/FileNotSelected';
 
-const TreeDisplay = <T extends TreeNodeConstructorType>(props: { treeFile: File | null; NodeClass: T }) => {
+// Number of children rendered at once, the rest is reachable through pager nodes
+const CHILDREN_PAGE_SIZE = 20;
+
+type ViewEntry =
+	| { kind: 'node'; node: TreeNode }
+	| { kind: 'pager'; parent: TreeNode; offset: number; label: string };
+
+const TreeDisplay = <T extends TreeNodeConstructorType>(props: {
+	treeFile: File | null;
+	chunkFiles: Map<string, File>;
+	NodeClass: T;
+}) => {
 	const [treeRoot, setTreeRoot] = useState<TreeNode | null>(null);
 	const [minSupport, setMinSupport] = useState<number>(0); // TODO: display this somewhere
+	const [expanded, setExpanded] = useState<Set<string>>(new Set());
+	const [offsets, setOffsets] = useState<Map<string, number>>(new Map());
 
 	const onFileRead = (content: string) => {
 		let treeRootObj: any = null;
@@ -28,40 +41,163 @@ const TreeDisplay = <T extends TreeNodeConstructorType>(props: { treeFile: File
 			const newTreeRoot: TreeNode = TreeNode.fromJson(treeRootObj?.tree, props.NodeClass);
 
 			setMinSupport(treeRootObj.min_support);
+			setExpanded(new Set());
+			setOffsets(new Map());
 			setTreeRoot(newTreeRoot);
+			expand(newTreeRoot);
 		} catch (e: any) {
 			showFileError(e?.message ?? 'Could not parse tree file');
 			setTreeRoot(null);
 		}
 	};
 
+	const expand = (node: TreeNode) => {
+		if (node.isLoaded) {
+			setExpanded((previous: Set<string>) => new Set(previous).add(node.key));
+			return;
+		}
+
+		// Children of a node may continue in the chunk named by next_chunk
+		const children: TreeNode[] = [];
+		const readChunk = (chunkName: string) => {
+			const chunkFile: File | undefined = props.chunkFiles.get(chunkName);
+			if (!chunkFile) {
+				showFileError(`Chunk file ${chunkName} not selected`);
+				return;
+			}
+
+			asyncReadFile(chunkFile, (content: string) => {
+				try {
+					const chunk: any = JSON.parse(content);
+					children.push(...TreeNode.childrenFromJson(chunk, props.NodeClass));
+					if (typeof chunk?.next_chunk === 'string') {
+						readChunk(chunk.next_chunk);
+						return;
+					}
+
+					node.loadChildren(children);
+					setExpanded((previous: Set<string>) => new Set(previous).add(node.key));
+				} catch (e: any) {
+					showFileError(e?.message ?? `Could not parse ${chunkFile.name}`);
+				}
+			});
+		};
+
+		readChunk(node.childrenChunk as string);
+	};
+
+	const onNodeClick = (node: TreeNode) => {
+		if (node.numChildren === 0) return;
+
+		if (expanded.has(node.key)) {
+			const newExpanded = new Set(expanded);
+			newExpanded.delete(node.key);
+			setExpanded(newExpanded);
+		} else {
+			expand(node);
+		}
+	};
+
+	const onPagerClick = (parent: TreeNode, offset: number) => {
+		setOffsets(new Map(offsets).set(parent.key, offset));
+	};
+
+	// Only expanded nodes and one page of their children are handed to react-d3-tree
+	const [viewData, viewEntries] = useMemo<[RawNodeDatum | null, Map<string, ViewEntry>]>(() => {
+		const entries = new Map<string, ViewEntry>();
+		if (!treeRoot) return [null, entries];
+
+		const buildView = (node: TreeNode): RawNodeDatum => {
+			const datum: RawNodeDatum = { name: `node:${node.key}` };
+			entries.set(datum.name, { kind: 'node', node });
+			if (!expanded.has(node.key) || !node.isLoaded) return datum;
+
+			const offset: number = offsets.get(node.key) ?? 0;
+			const children: RawNodeDatum[] = [];
+			const addPager = (pagerOffset: number, label: string) => {
+				const name = `pager:${node.key}:${pagerOffset}`;
+				entries.set(name, { kind: 'pager', parent: node, offset: pagerOffset, label });
+				children.push({ name });
+			};
+
+			if (offset > 0) addPager(Math.max(0, offset - CHILDREN_PAGE_SIZE), `${offset} previous`);
+			node.children.slice(offset, offset + CHILDREN_PAGE_SIZE).forEach((child: TreeNode) => {
+				children.push(buildView(child));
+			});
+			const remaining: number = node.children.length - offset - CHILDREN_PAGE_SIZE;
+			if (remaining > 0) addPager(offset + CHILDREN_PAGE_SIZE, `${remaining} more`);
+
+			datum.children = children;
+			return datum;
+		};
+
+		return [buildView(treeRoot), entries];
+	}, [treeRoot, expanded, offsets]);
+
 	useEffect(() => {
 		if (props.treeFile) asyncReadFile(props.treeFile, onFileRead);
 	}, [props.treeFile]);
 
 	return (
 		<div style={{ width: '100%', height: '100%' }}>
-			{treeRoot && (
+			{viewData && (
 				<Tree
-					data={treeRoot}
+					data={viewData}
 					nodeSize={{ x: 300, y: 150 }}
+					collapsible={false}
 					renderCustomNodeElement={(rd3tProps: CustomNodeElementProps) => {
+						const entry: ViewEntry | undefined = viewEntries.get(rd3tProps.nodeDatum.name);
+						if (!entry) return <g />;
+
+						if (entry.kind === 'pager')
+							return renderPager({
+								label: entry.label,
+								onClick: () => onPagerClick(entry.parent, entry.offset),
+							});
+
 						return renderNode({
-							...rd3tProps,
-							nodeDatum: rd3tProps.nodeDatum as unknown as TreeNode,
+							nodeDatum: entry.node,
+							isExpanded: expanded.has(entry.node.key),
+							onClick: () => onNodeClick(entry.node),
 						});
 					}}
 				/>
 			)}
-			{!treeRoot && <FileNotSelected />}
+			{!viewData && <FileNotSelected />}
 		</div>
 	);
 };
 
-const renderNode = ({ nodeDatum }: { nodeDatum: TreeNode }) => {
+const renderPager = ({ label, onClick }: { label: string; onClick: () => void }) => {
+	return (
+		<g onClick={onClick} style={{ cursor: 'pointer' }}>
+			<rect x={-60} y={-15} width={120} height={30} fill="#dededebe" stroke="black"></rect>
+			<text textAnchor="middle" y={5} strokeWidth={0}>
+				{label}
+			</text>
+		</g>
+	);
+};
+
+const renderNode = ({
+	nodeDatum,
+	isExpanded,
+	onClick,
+}: {
+	nodeDatum: TreeNode;
+	isExpanded: boolean;
+	onClick: () => void;
+}) => {
+	const isCollapsed: boolean = nodeDatum.numChildren > 0 && !isExpanded;
+
 	return (
 		<g>
-			<circle r={15}></circle>
+			<circle
+				r={15}
+				onClick={onClick}
+				fill={isCollapsed ? 'white' : 'black'}
+				style={{ cursor: nodeDatum.numChildren > 0 ? 'pointer' : 'default' }}
+			></circle>
 			<foreignObject width={250} height={100} x={-125} y={20}>
 				<div
 					style={{
@@ -88,6 +224,9 @@ const renderNode = ({ nodeDatum }: { nodeDatum: TreeNode }) => {
 						</div>
 						<p>
 							Token ids: <b>{joinListOrEmpty(nodeDatum.tokensIds)}</b>
+							<span style={{ float: 'right' }}>
+								Children: <b>{nodeDatum.numChildren}</b>
+							</span>
 						</p>
 						<p style={{ textAlign: 'center' }}>{nodeDatum.idSetLabel}:</p>
 						<div>{joinListOrEmpty(nodeDatum.idSet)}</div>
@@ -5,20 +5,41 @@ export type TreeNodeConstructorType = new (
 	tokens: string[],
 	support: number,
 	idSet: number[],
-	children: TreeNode[]
+	children: TreeNode[],
+	childrenChunk?: string | null,
+	numChildren?: number
 ) => TreeNode;
 
 export abstract class TreeNode implements RawNodeDatum {
 	readonly name: '' = '';
 	abstract readonly idSetLabel: string;
+	readonly numChildren: number;
 
 	constructor(
 		public readonly tokensIds: number[],
 		public readonly tokens: string[],
 		public readonly support: number,
 		public readonly idSet: number[],
-		public readonly children: TreeNode[]
-	) {}
+		public children: TreeNode[],
+		// Name of the chunk file with the children, null once they are loaded
+		public childrenChunk: string | null = null,
+		numChildren?: number
+	) {
+		this.numChildren = numChildren ?? children.length;
+	}
+
+	get key(): string {
+		return this.tokensIds.join(',');
+	}
+
+	get isLoaded(): boolean {
+		return this.childrenChunk === null;
+	}
+
+	loadChildren(children: TreeNode[]) {
+		this.children = children;
+		this.childrenChunk = null;
+	}
 
 	static fromJson<T extends TreeNodeConstructorType>(json: any, NodeClass: T): TreeNode {
 		if (typeof json !== 'object' || json === null || json === undefined) throw new Error('Invalid tree file');
@@ -39,14 +60,33 @@ export abstract class TreeNode implements RawNodeDatum {
 		if (json?.id_set.some((id: any) => typeof id !== 'number'))
 			throw new Error('Invalid tree file format: id_set contains non-numbers');
 
-		if (!Array.isArray(json?.children)) throw new Error('Invalid tree file format: children is not an array');
+		if (typeof json?.children_chunk === 'string') {
+			if (typeof json?.num_children !== 'number')
+				throw new Error('Invalid tree file format: num_children is not a number');
+
+			return new NodeClass(
+				json.tokens_ids,
+				json.tokens,
+				json.support,
+				json.id_set,
+				[],
+				json.children_chunk,
+				json.num_children
+			);
+		}
 
 		return new NodeClass(
 			json.tokens_ids,
 			json.tokens,
 			json.support,
 			json.id_set,
-			json.children.map((child: any) => TreeNode.fromJson(child, NodeClass))
+			TreeNode.childrenFromJson(json, NodeClass)
 		);
 	}
+
+	static childrenFromJson<T extends TreeNodeConstructorType>(json: any, NodeClass: T): TreeNode[] {
+		if (!Array.isArray(json?.children)) throw new Error('Invalid tree file format: children is not an array');
+
+		return json.children.map((child: any) => TreeNode.fromJson(child, NodeClass));
+	}
 }
@@ -0,0 +1,459 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import BinaryIO, Callable, Union
+
+import click
+
+from mining import (
+    Algorithm,
+    IdSetsLengthStats,
+    TreeNode,
+    save_tree,
+)
+
+MAGIC = b"DECLATB1"
+HEADER_LENGTH = struct.Struct("<I")
+
+Codec = tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]
+
+# Sizes of the C types behind array typecodes depend on the platform, so the
+# 4 byte ones are picked explicitly
+INT32: str = next(typecode for typecode in "ihl" if array(typecode).itemsize == 4)
+UINT32: str = next(typecode for typecode in "IHL" if array(typecode).itemsize == 4)
+
+# Fixed-width node columns, one entry per node in preorder.
+# subtree_end is the index past the last descendant of the node, so every
+# subtree is a contiguous range of nodes.
+NODE_COLUMNS: dict[str, str] = {
+    "parent": INT32,
+    "token_id": INT32,
+    "support": UINT32,
+    "subtree_end": UINT32,
+    "id_set_length": UINT32,
+}
+
+
+def get_codec(compression: str) -> Codec:
+    if compression == "none":
+        return bytes, bytes
+    if compression == "zlib":
+        return zlib.compress, zlib.decompress
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Compression zstd requires the zstandard package")
+
+        return (
+            zstandard.ZstdCompressor().compress,
+            zstandard.ZstdDecompressor().decompress,
+        )
+    if compression == "lz4":
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ValueError("Compression lz4 requires the lz4 package")
+
+        return lz4.frame.compress, lz4.frame.decompress
+
+    raise ValueError(f"Unknown compression {compression}")
+
+
+def to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def from_bytes(typecode: str, data: bytes) -> array:
+    values: array = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values
+
+
+def delta_encode(id_set: set[int]) -> list[int]:
+    previous: int = 0
+    deltas: list[int] = []
+    for transaction_id in sorted(id_set):
+        deltas.append(transaction_id - previous)
+        previous = transaction_id
+
+    return deltas
+
+
+def flatten_tree(tree: TreeNode) -> list[tuple[TreeNode, int]]:
+    # Preorder list of (node, parent index)
+    nodes: list[tuple[TreeNode, int]] = []
+    stack: list[tuple[TreeNode, int]] = [(tree, -1)]
+    while len(stack) > 0:
+        node, parent = stack.pop()
+        index: int = len(nodes)
+        nodes.append((node, parent))
+        for child in reversed(node.children):
+            stack.append((child, index))
+
+    return nodes
+
+
+class SectionWriter:
+    def __init__(self, file: BinaryIO, compress: Callable[[bytes], bytes]) -> None:
+        self.file: BinaryIO = file
+        self.compress: Callable[[bytes], bytes] = compress
+        self.offset: int = 0
+
+    def write(self, data: bytes) -> list[int]:
+        compressed: bytes = self.compress(data)
+        self.file.write(compressed)
+        section: list[int] = [self.offset, len(compressed)]
+        self.offset += len(compressed)
+
+        return section
+
+
+def save_tree_binary(
+    tree: TreeNode,
+    directory: str,
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_length_stats: IdSetsLengthStats,
+    compression: str = "zlib",
+    block_size: int = 1024,
+) -> None:
+    compress, _ = get_codec(compression)
+    nodes: list[tuple[TreeNode, int]] = flatten_tree(tree)
+
+    columns: dict[str, array] = {
+        name: array(typecode) for name, typecode in NODE_COLUMNS.items()
+    }
+    columns["subtree_end"].extend([0] * len(nodes))
+    vocabulary: dict[int, str] = {}
+    for node, parent in nodes:
+        columns["parent"].append(parent)
+        columns["token_id"].append(node.tokens_ids[-1] if node.tokens_ids else -1)
+        columns["support"].append(node.support)
+        columns["id_set_length"].append(len(node.id_set))
+        if node.tokens_ids and node.tokens:
+            vocabulary[node.tokens_ids[-1]] = node.tokens[-1]
+
+    # Nodes are in preorder, so a node's subtree ends where the subtree
+    # of its last child ends.
+    for index in reversed(range(len(nodes))):
+        node, parent = nodes[index]
+        if columns["subtree_end"][index] == 0:
+            columns["subtree_end"][index] = index + 1
+        if parent >= 0 and columns["subtree_end"][parent] == 0:
+            columns["subtree_end"][parent] = columns["subtree_end"][index]
+
+    with open(f"{directory}/{algorithm}.bin", "wb") as file:
+        file.write(MAGIC)
+        writer: SectionWriter = SectionWriter(file, compress)
+        sections: dict[str, list[int]] = {
+            name: writer.write(to_bytes(values)) for name, values in columns.items()
+        }
+        sections["vocabulary_ids"] = writer.write(
+            to_bytes(array(INT32, vocabulary.keys()))
+        )
+        sections["vocabulary"] = writer.write(
+            "\n".join(vocabulary.values()).encode("utf-8")
+        )
+
+        id_set_blocks: list[list[int]] = []
+        for start in range(0, len(nodes), block_size):
+            deltas: array = array(UINT32)
+            for node, _ in nodes[start : start + block_size]:
+                deltas.extend(delta_encode(node.id_set))
+            id_set_blocks.append(writer.write(to_bytes(deltas)))
+
+        # The header goes last, once the offsets of all sections are known
+        header: dict = {
+            "min_support": min_support,
+            "algorithm": algorithm,
+            "id_sets_length_stats": id_sets_length_stats.__dict__,
+            "compression": compression,
+            "num_nodes": len(nodes),
+            "block_size": block_size,
+            "sections": sections,
+            "id_set_blocks": id_set_blocks,
+        }
+        header_bytes: bytes = json.dumps(header).encode("utf-8")
+        file.write(header_bytes)
+        file.write(HEADER_LENGTH.pack(len(header_bytes)))
+
+
+class BinaryTree:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a binary tree file")
+
+            file.seek(-HEADER_LENGTH.size, 2)
+            (header_length,) = HEADER_LENGTH.unpack(file.read(HEADER_LENGTH.size))
+            file.seek(-HEADER_LENGTH.size - header_length, 2)
+            self.header: dict = json.loads(file.read(header_length))
+
+        self.body_offset: int = len(MAGIC)
+        _, self.decompress = get_codec(self.header["compression"])
+
+        self.min_support: int = self.header["min_support"]
+        self.algorithm: Algorithm = self.header["algorithm"]
+        self.id_sets_length_stats: IdSetsLengthStats = IdSetsLengthStats(
+            **self.header["id_sets_length_stats"]
+        )
+        self.num_nodes: int = self.header["num_nodes"]
+
+        self.columns: dict[str, array] = {
+            name: from_bytes(typecode, self.read_section(self.header["sections"][name]))
+            for name, typecode in NODE_COLUMNS.items()
+        }
+        vocabulary_ids: array = from_bytes(
+            INT32, self.read_section(self.header["sections"]["vocabulary_ids"])
+        )
+        vocabulary: bytes = self.read_section(self.header["sections"]["vocabulary"])
+        self.tokens_map: dict[int, str] = (
+            dict(zip(vocabulary_ids, vocabulary.decode("utf-8").split("\n")))
+            if len(vocabulary_ids) > 0
+            else {}
+        )
+        self.id_set_blocks_cache: dict[int, list[set[int]]] = {}
+
+    def read_section(self, section: list[int]) -> bytes:
+        offset, length = section
+        with open(self.path, "rb") as file:
+            file.seek(self.body_offset + offset)
+            return self.decompress(file.read(length))
+
+    def read_id_set_block(self, block: int) -> list[set[int]]:
+        if block not in self.id_set_blocks_cache:
+            deltas: array = from_bytes(
+                UINT32, self.read_section(self.header["id_set_blocks"][block])
+            )
+            block_size: int = self.header["block_size"]
+            lengths: array = self.columns["id_set_length"][
+                block * block_size : (block + 1) * block_size
+            ]
+            id_sets: list[set[int]] = []
+            start: int = 0
+            for length in lengths:
+                id_sets.append(set(accumulate(deltas[start : start + length])))
+                start += length
+            self.id_set_blocks_cache[block] = id_sets
+
+        return self.id_set_blocks_cache[block]
+
+    def read_id_set(self, index: int) -> set[int]:
+        block_size: int = self.header["block_size"]
+        return self.read_id_set_block(index // block_size)[index % block_size]
+
+    def get_tokens_ids(self, index: int) -> list[int]:
+        tokens_ids: list[int] = []
+        while index > 0:
+            tokens_ids.append(self.columns["token_id"][index])
+            index = self.columns["parent"][index]
+
+        return tokens_ids[::-1]
+
+    def read_subtree(self, index: int = 0) -> TreeNode:
+        subtree_end: int = self.columns["subtree_end"][index]
+        subtree: TreeNode = TreeNode(
+            self.get_tokens_ids(index),
+            self.columns["support"][index],
+            self.read_id_set(index),
+        )
+        nodes: dict[int, TreeNode] = {index: subtree}
+        for child_index in range(index + 1, subtree_end):
+            parent: TreeNode = nodes[self.columns["parent"][child_index]]
+            node: TreeNode = TreeNode(
+                parent.tokens_ids + [self.columns["token_id"][child_index]],
+                self.columns["support"][child_index],
+                self.read_id_set(child_index),
+            )
+            parent.add_child(node)
+            nodes[child_index] = node
+
+        subtree.decode(self.tokens_map)
+        return subtree
+
+    def get_children(self, index: int = 0) -> list[int]:
+        children: list[int] = []
+        child: int = index + 1
+        while child < self.columns["subtree_end"][index]:
+            children.append(child)
+            child = self.columns["subtree_end"][child]
+
+        return children
+
+
+def count_subtree_sizes(node: TreeNode, sizes: dict[int, int]) -> int:
+    size: int = 1 + sum(count_subtree_sizes(child, sizes) for child in node.children)
+    sizes[id(node)] = size
+
+    return size
+
+
+class TreeChunker:
+    def __init__(
+        self, directory: str, algorithm: Algorithm, max_chunk_nodes: int
+    ) -> None:
+        self.directory: str = directory
+        self.algorithm: Algorithm = algorithm
+        self.max_chunk_nodes: int = max_chunk_nodes
+        self.subtree_sizes: dict[int, int] = {}
+        self.num_chunks: int = 0
+
+    def get_chunk_name(self) -> str:
+        chunk_name: str = f"{self.algorithm}.chunk.{self.num_chunks}.json"
+        self.num_chunks += 1
+
+        return chunk_name
+
+    def write_chunk(self, chunk_name: str, chunk: dict) -> None:
+        with open(f"{self.directory}/{chunk_name}", "w") as file:
+            json.dump(chunk, file)
+
+    def encode(self, node: TreeNode, capacity: int) -> tuple[dict, int]:
+        # Returns the node with the number of nodes it adds to its file.
+        # Subtrees fitting in the capacity are kept inline, larger ones become
+        # a stub pointing to the chunks with their children. Nodes are turned
+        # into plain dicts here, so the output does not depend on which module
+        # the TreeNode class was loaded from (build_tree may run as __main__).
+        encoded: dict = {
+            "tokens_ids": node.tokens_ids,
+            "tokens": node.tokens,
+            "support": node.support,
+            "id_set": list(node.id_set),
+        }
+        subtree_size: int = self.subtree_sizes[id(node)]
+        if subtree_size <= capacity:
+            encoded["children"] = [
+                self.encode(child, subtree_size)[0] for child in node.children
+            ]
+            return encoded, subtree_size
+
+        encoded["num_children"] = len(node.children)
+        encoded["children_chunk"] = self.save_children(node.children)
+        return encoded, 1
+
+    def save_children(self, children: list[TreeNode]) -> str:
+        # Children are packed into a chain of chunks of at most max_chunk_nodes
+        # nodes, each naming the next one. A subtree that does not fit in the
+        # rest of a chunk, but fits in an empty one, starts the next chunk.
+        first_chunk_name: str = self.get_chunk_name()
+        chunk_name: str = first_chunk_name
+        chunk: dict = {"children": []}
+        num_nodes: int = 0
+        for child in children:
+            subtree_size: int = self.subtree_sizes[id(child)]
+            if num_nodes == self.max_chunk_nodes or (
+                num_nodes > 0
+                and self.max_chunk_nodes - num_nodes < subtree_size
+                and subtree_size <= self.max_chunk_nodes
+            ):
+                next_chunk_name: str = self.get_chunk_name()
+                chunk["next_chunk"] = next_chunk_name
+                self.write_chunk(chunk_name, chunk)
+                chunk_name, chunk, num_nodes = next_chunk_name, {"children": []}, 0
+
+            encoded, size = self.encode(child, self.max_chunk_nodes - num_nodes)
+            chunk["children"].append(encoded)
+            num_nodes += size
+
+        self.write_chunk(chunk_name, chunk)
+        return first_chunk_name
+
+
+def save_tree_chunked(
+    tree: TreeNode,
+    directory: str,
+    min_support: int,
+    algorithm: Algorithm,
+    id_sets_length_stats: IdSetsLengthStats,
+    max_chunk_nodes: int = 1000,
+) -> None:
+    for old_chunk in Path(directory).glob(f"{algorithm}.chunk.*.json"):
+        old_chunk.unlink()
+
+    chunker: TreeChunker = TreeChunker(directory, algorithm, max_chunk_nodes)
+    count_subtree_sizes(tree, chunker.subtree_sizes)
+
+    result = {
+        "min_support": min_support,
+        "id_sets_length_stats": id_sets_length_stats.__dict__,
+        "tree": chunker.encode(tree, max_chunk_nodes)[0],
+    }
+    with open(f"{directory}/{algorithm}.index.json", "w") as file:
+        json.dump(result, file, indent=2)
+
+
+def convert_binary_tree(
+    path: str, directory: Union[str, None] = None, output_format: str = "json"
+) -> str:
+    binary_tree: BinaryTree = BinaryTree(path)
+    if directory is None:
+        directory = str(Path(path).parent)
+
+    if output_format == "chunked":
+        save_tree_chunked(
+            binary_tree.read_subtree(),
+            directory,
+            binary_tree.min_support,
+            binary_tree.algorithm,
+            binary_tree.id_sets_length_stats,
+        )
+        return f"{directory}/{binary_tree.algorithm}.index.json"
+
+    save_tree(
+        binary_tree.read_subtree(),
+        directory,
+        binary_tree.min_support,
+        binary_tree.algorithm,
+        binary_tree.id_sets_length_stats,
+    )
+    return f"{directory}/{binary_tree.algorithm}.json"
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input",
+    "input_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Binary tree file to convert",
+)
+@click.option(
+    "-d",
+    "--directory",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory to save the JSON tree to  [default: input file directory]",
+)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    default="json",
+    show_default=True,
+    type=click.Choice(["json", "chunked"]),
+    help="JSON layout to convert to",
+)
+def convert_tree_cli(
+    input_path: str, directory: Union[str, None], output_format: str
+) -> None:
+    output_path: str = convert_binary_tree(input_path, directory, output_format)
+
+    print(f"All good! Tree saved to {output_path}")
+
+
+if __name__ == "__main__":
+    convert_tree_cli()